@@ -0,0 +1,62 @@
+"""
+Compare the speed of the link extractors on real pages
+
+usage:
+
+    python linkextractor-bench.py [--restrict-xpaths=XPATH] [-n 20] page.html [page2.html ...]
+
+Pages are read from the given files (or from the Scrapy test data if none is
+given) and extracted as responses from http://example.com/. A new response is
+built for every extraction, so parsing time is always included.
+"""
+
+import os
+import sys
+import glob
+import optparse
+from time import time
+
+from scrapy.http import HtmlResponse
+from scrapy.contrib.linkextractors.sgml import SgmlLinkExtractor
+from scrapy.contrib.linkextractors.lxmlhtml import LxmlLinkExtractor
+
+
+def bench(extractor, pages, iterations):
+    links = 0
+    start = time()
+    for _ in xrange(iterations):
+        for body in pages:
+            response = HtmlResponse('http://example.com/', body=body)
+            links += len(extractor.extract_links(response))
+    return time() - start, links / iterations
+
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [options] [page ...]")
+    parser.add_option("-n", dest="iterations", type="int", default=20,
+        help="number of times each page is extracted (default: %default)")
+    parser.add_option("--restrict-xpaths", metavar="XPATH", default=(),
+        help="only extract links from the given region")
+    opts, args = parser.parse_args()
+
+    if not args:
+        testdata = os.path.join(os.path.dirname(__file__), os.pardir, 'scrapy',
+            'tests', 'sample_data')
+        args = glob.glob(os.path.join(testdata, '*', '*.html'))
+    pages = [open(path, 'rb').read() for path in args]
+    size = sum(map(len, pages))
+    print "%d pages, %d KB, %d iterations" % (len(pages), size / 1024, opts.iterations)
+
+    results = []
+    for cls in (SgmlLinkExtractor, LxmlLinkExtractor):
+        elapsed, links = bench(cls(restrict_xpaths=opts.restrict_xpaths),
+            pages, opts.iterations)
+        results.append(elapsed)
+        rate = size * opts.iterations / elapsed / 1024 / 1024
+        print "%-20s %8.3fs %8.2f MB/s %6d links" % (cls.__name__, elapsed,
+            rate, links)
+    print "speedup: %.1fx" % (results[0] / results[1])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
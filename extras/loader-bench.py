@@ -0,0 +1,71 @@
+"""
+Measure the time spent loading items with Item Loaders
+
+usage:
+
+    python loader-bench.py [-n 10000]
+
+Each iteration loads an item with several fields, using input and output
+processors declared in the loader and in the item fields, some of them
+receiving the loader context.
+"""
+
+import sys
+import optparse
+from time import time
+
+from scrapy.item import Item, Field
+from scrapy.contrib.loader import ItemLoader
+from scrapy.contrib.loader.processor import MapCompose, Compose, TakeFirst, \
+    Join, Identity
+
+
+def multiply(value, loader_context):
+    return value * loader_context.get('factor', 1)
+
+
+class Product(Item):
+    name = Field(input_processor=MapCompose(unicode.strip, unicode.title))
+    price = Field(output_processor=TakeFirst())
+    description = Field(output_processor=Join())
+    tags = Field()
+    url = Field()
+    stock = Field()
+
+
+class ProductLoader(ItemLoader):
+    default_item_class = Product
+    default_output_processor = TakeFirst()
+
+    price_in = MapCompose(float, multiply)
+    tags_out = Identity()
+    stock_in = Compose(lambda v: v[0], int)
+
+
+def load(i):
+    loader = ProductLoader(factor=2)
+    loader.add_value('name', u'  product number %d ' % i)
+    loader.add_value('price', u'%d.99' % i)
+    loader.add_value('description', [u'first line', u'second line'])
+    loader.add_value('tags', [u'a', u'b', u'c'])
+    loader.add_value('url', u'http://example.com/%d' % i)
+    loader.add_value('stock', [u'%d' % i])
+    return loader.load_item()
+
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [options]")
+    parser.add_option("-n", dest="iterations", type="int", default=10000,
+        help="number of items to load (default: %default)")
+    opts, args = parser.parse_args()
+
+    start = time()
+    for i in xrange(opts.iterations):
+        load(i)
+    elapsed = time() - start
+    print "%d items in %.3fs: %.1f us/item" % (opts.iterations, elapsed,
+        elapsed * 1e6 / opts.iterations)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Compare the time and memory spent building lxml documents from responses by
+parsing their raw body against decoding it and re-encoding it to utf-8 first
+
+usage:
+
+    python lxmldocument-bench.py [-n 20] [--encoding=ENCODING] page.html [page2.html ...]
+
+Pages are read from the given files (or from the Scrapy test data if none is
+given). The memory reported is the size of the copies of the body made before
+parsing it, which are avoided when the raw body can be parsed.
+"""
+
+import os
+import sys
+import glob
+import optparse
+from time import time
+
+from lxml import etree
+
+from scrapy.http import HtmlResponse
+from scrapy.selector.lxmldocument import _factory
+
+
+def reencoded_factory(response, parser_cls):
+    body = response.body_as_unicode().strip().encode('utf8') or '<html/>'
+    parser = parser_cls(recover=True, encoding='utf8')
+    return etree.fromstring(body, parser=parser, base_url=response.url)
+
+
+def copies_size(response):
+    ubody = response.body_as_unicode()
+    return sys.getsizeof(ubody) + sys.getsizeof(ubody.strip().encode('utf8'))
+
+
+def bench(factory, pages, encoding, iterations):
+    start = time()
+    for _ in xrange(iterations):
+        for body in pages:
+            # a new response every time, to not reuse its decoded body
+            response = HtmlResponse('http://example.com/', body=body,
+                                    encoding=encoding)
+            factory(response, etree.HTMLParser)
+    return time() - start
+
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [options] [page ...]")
+    parser.add_option("-n", dest="iterations", type="int", default=20,
+        help="number of times each page is parsed (default: %default)")
+    parser.add_option("--encoding", default='utf-8',
+        help="encoding of the pages (default: %default)")
+    opts, args = parser.parse_args()
+
+    if not args:
+        testdata = os.path.join(os.path.dirname(__file__), os.pardir, 'scrapy',
+            'tests', 'sample_data')
+        args = glob.glob(os.path.join(testdata, '*', '*.html'))
+    pages = [open(path, 'rb').read() for path in args]
+    size = sum(map(len, pages))
+    print "%d pages, %d KB, %d iterations" % (len(pages), size / 1024, opts.iterations)
+
+    results = []
+    for name, factory in (('re-encoded', reencoded_factory), ('raw', _factory)):
+        elapsed = bench(factory, pages, opts.encoding, opts.iterations)
+        results.append(elapsed)
+        print "%-12s %8.3fs %8.2f ms/page" % (name, elapsed,
+            elapsed * 1000 / len(pages) / opts.iterations)
+    print "speedup: %.1fx" % (results[0] / results[1])
+    saved = sum(copies_size(HtmlResponse('http://example.com/', body=body,
+        encoding=opts.encoding)) for body in pages)
+    print "memory saved: %d KB per page" % (saved / 1024 / len(pages))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
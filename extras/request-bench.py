@@ -0,0 +1,53 @@
+"""
+Measure the speed of building requests
+
+usage:
+
+    python request-bench.py [-n 100000]
+
+Requests are built from new urls (like the ones extracted from pages), from
+the urls of other requests, and copied with Request.replace() (like the
+redirect, retry and cookies middlewares do).
+"""
+
+import sys
+import optparse
+from time import time
+
+from scrapy.http import Request
+
+
+def parse(response):
+    pass
+
+
+def bench(name, func, args):
+    start = time()
+    for arg in args:
+        func(arg)
+    elapsed = time() - start
+    print "%-12s %8.3fs %8.0f requests/s %6.2f us/request" % (name, elapsed,
+        len(args) / elapsed, elapsed * 1e6 / len(args))
+
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [options]")
+    parser.add_option("-n", dest="requests", type="int", default=100000,
+        help="number of requests to build (default: %default)")
+    opts, args = parser.parse_args()
+
+    urls = ['http://www.example.com/category/%d/product?id=%d&sort=price' \
+        % (i % 100, i) for i in xrange(opts.requests)]
+    unsafe_urls = [u'http://www.example.com/b\xfasqueda?q=caf\xe9 %d' % i \
+        for i in xrange(opts.requests)]
+    requests = [Request(url, callback=parse) for url in urls]
+
+    bench('new', lambda url: Request(url, callback=parse), urls)
+    bench('new unsafe', lambda url: Request(url, callback=parse), unsafe_urls)
+    bench('from url', lambda r: Request(r.url, callback=parse), requests)
+    bench('replace', lambda r: r.replace(priority=1), requests)
+    bench('copy', lambda r: r.copy(), requests)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Measure the memory used by the requests waiting in the scheduler queues
+
+usage:
+
+    python request-memory-bench.py [-n 200000] [--referer] [--no-fingerprint]
+
+Requests are built the way spiders usually build them (url and callback only)
+and pushed to an in-memory queue, after going through the duplicates filter
+(which computes their fingerprint) unless --no-fingerprint is given. With
+--referer each request also gets the header set by the RefererMiddleware.
+The resident memory growth is reported in bytes per queued request.
+"""
+
+import gc
+import os
+import sys
+import optparse
+import resource
+from time import time
+
+from queuelib import queue
+
+from scrapy.http import Request
+from scrapy.utils.request import request_fingerprint
+
+
+def rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except IOError:
+        # ru_maxrss is in kilobytes on linux and in bytes on mac os
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * \
+            (1 if sys.platform == 'darwin' else 1024)
+
+
+def parse(response):
+    pass
+
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [options]")
+    parser.add_option("-n", dest="requests", type="int", default=200000,
+        help="number of requests to queue (default: %default)")
+    parser.add_option("--referer", action="store_true",
+        help="set a Referer header in every request")
+    parser.add_option("--no-fingerprint", dest="fingerprint",
+        action="store_false", default=True,
+        help="don't compute the request fingerprints")
+    opts, args = parser.parse_args()
+
+    q = queue.LifoMemoryQueue()
+    seen = set()
+    urls = ['http://www.example.com/category/%d/product?id=%d' % (i % 100, i)
+            for i in xrange(opts.requests)]
+    gc.collect()
+    before = rss()
+    start = time()
+    for url in urls:
+        request = Request(url, callback=parse)
+        if opts.referer:
+            request.headers['Referer'] = 'http://www.example.com/'
+        if opts.fingerprint:
+            seen.add(request_fingerprint(request))
+        q.push(request)
+    elapsed = time() - start
+    gc.collect()
+    used = rss() - before
+    print "%d requests in %.3fs: %.1f us/request, %d bytes/request" % (
+        len(q), elapsed, elapsed * 1e6 / len(q), used / len(q))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
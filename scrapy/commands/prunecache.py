@@ -0,0 +1,44 @@
+from scrapy.command import ScrapyCommand
+from scrapy.spider import BaseSpider
+from scrapy.utils.misc import load_object
+
+class Command(ScrapyCommand):
+
+    requires_project = True
+    default_settings = {'LOG_ENABLED': False}
+
+    def syntax(self):
+        return "[options] [spider ...]"
+
+    def short_desc(self):
+        return "Prune expired and exceeding responses from the HTTP cache"
+
+    def long_desc(self):
+        return "Delete the expired responses (see HTTPCACHE_EXPIRATION_SECS) " \
+            "and, if the cache storage supports it, the responses exceeding " \
+            "the maximum cache size (see HTTPCACHE_MAX_SIZE) from the HTTP " \
+            "cache of the given spiders (or all spiders) and reclaim their space."
+
+    def add_options(self, parser):
+        ScrapyCommand.add_options(self, parser)
+        parser.add_option("--max-size", type="int", metavar="BYTES", \
+            help="maximum cache size per spider (default: HTTPCACHE_MAX_SIZE)")
+
+    def process_options(self, args, opts):
+        ScrapyCommand.process_options(self, args, opts)
+        if opts.max_size is not None:
+            self.settings.overrides['HTTPCACHE_MAX_SIZE'] = opts.max_size
+
+    def run(self, args, opts):
+        storagecls = load_object(self.settings['HTTPCACHE_STORAGE'])
+        for name in args or self.crawler.spiders.list():
+            spider = BaseSpider(name)
+            storage = storagecls(self.settings)
+            storage.open_spider(spider)
+            try:
+                pruned = storage.prune() if hasattr(storage, 'prune') else 0
+                if hasattr(storage, 'compact'):
+                    storage.compact()
+            finally:
+                storage.close_spider(spider)
+            print "%s: %d responses pruned" % (name, pruned)
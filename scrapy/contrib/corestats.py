@@ -4,11 +4,22 @@ Extension for collecting core stats like items scraped and start/finish times
 import datetime
 
 from scrapy import signals
+from scrapy.selector.lxmlsel import xpath_cache_stats
+from scrapy.utils.url import canonicalize_url_cache_stats
+from scrapy.utils.request import fingerprint_cache_stats
+
+# caches shared by all the spiders of the process, by stats prefix
+shared_cache_stats = {
+    'selector/xpath_cache': xpath_cache_stats,
+    'url/canonicalize_cache': canonicalize_url_cache_stats,
+    'request/fingerprint_cache': fingerprint_cache_stats,
+}
 
 class CoreStats(object):
 
     def __init__(self, stats):
         self.stats = stats
+        self.shared_cache_stats = {}
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -22,10 +33,18 @@ class CoreStats(object):
 
     def spider_opened(self, spider):
         self.stats.set_value('start_time', datetime.datetime.utcnow(), spider=spider)
+        self.shared_cache_stats[spider] = dict((prefix, stats.copy())
+            for prefix, stats in shared_cache_stats.iteritems())
 
     def spider_closed(self, spider, reason):
         self.stats.set_value('finish_time', datetime.datetime.utcnow(), spider=spider)
         self.stats.set_value('finish_reason', reason, spider=spider)
+        # the caches are shared by all spiders, only count their lifetime
+        started = self.shared_cache_stats.pop(spider, {})
+        for prefix, stats in shared_cache_stats.iteritems():
+            for key, value in stats.iteritems():
+                self.stats.set_value('%s/%s' % (prefix, key),
+                    value - started.get(prefix, {}).get(key, 0), spider=spider)
 
     def item_scraped(self, item, spider):
         self.stats.inc_value('item_scraped_count', spider=spider)
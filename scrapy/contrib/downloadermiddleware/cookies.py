@@ -1,8 +1,8 @@
 import os
+from time import time
 from collections import defaultdict
 
 from scrapy.exceptions import NotConfigured
-from scrapy.http import Response
 from scrapy.http.cookies import CookieJar
 from scrapy import log
 
@@ -10,22 +10,25 @@ from scrapy import log
 class CookiesMiddleware(object):
     """This middleware enables working with sites that need cookies"""
 
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, idle_timeout=0):
         self.jars = defaultdict(CookieJar)
         self.debug = debug
+        self.idle_timeout = idle_timeout
+        self.last_used = {}
+        self.last_eviction = time()
 
     @classmethod
     def from_crawler(cls, crawler):
         if not crawler.settings.getbool('COOKIES_ENABLED'):
             raise NotConfigured
-        return cls(crawler.settings.getbool('COOKIES_DEBUG'))
+        return cls(crawler.settings.getbool('COOKIES_DEBUG'),
+            crawler.settings.getint('COOKIES_JAR_IDLE_TIMEOUT'))
 
     def process_request(self, request, spider):
         if 'dont_merge_cookies' in request.meta:
             return
 
-        cookiejarkey = request.meta.get("cookiejar")
-        jar = self.jars[cookiejarkey]
+        jar = self._get_jar(request)
         cookies = self._get_request_cookies(jar, request)
         for cookie in cookies:
             jar.set_cookie_if_ok(cookie, request)
@@ -40,13 +43,31 @@ class CookiesMiddleware(object):
             return response
 
         # extract cookies from Set-Cookie and drop invalid/expired cookies
-        cookiejarkey = request.meta.get("cookiejar")
-        jar = self.jars[cookiejarkey]
+        jar = self._get_jar(request)
         jar.extract_cookies(response, request)
         self._debug_set_cookie(response, spider)
 
         return response
 
+    def _get_jar(self, request):
+        cookiejarkey = request.meta.get("cookiejar")
+        if self.idle_timeout:
+            now = time()
+            if cookiejarkey is not None:
+                self.last_used[cookiejarkey] = now
+            if now - self.last_eviction > self.idle_timeout:
+                self._evict_idle_jars(now)
+        return self.jars[cookiejarkey]
+
+    def _evict_idle_jars(self, now):
+        # only the jars selected with the cookiejar meta key are evicted, the
+        # default jar is kept for the whole crawl
+        self.last_eviction = now
+        for key, used in self.last_used.items():
+            if now - used > self.idle_timeout:
+                del self.last_used[key]
+                self.jars.pop(key, None)
+
     def _debug_cookie(self, request, spider):
         if self.debug:
             cl = request.headers.getlist('Cookie')
@@ -63,17 +84,6 @@ class CookiesMiddleware(object):
                 msg += os.linesep.join("Set-Cookie: %s" % c for c in cl)
                 log.msg(msg, spider=spider, level=log.DEBUG)
 
-    def _format_cookie(self, cookie):
-        # build cookie string
-        cookie_str = '%s=%s' % (cookie['name'], cookie['value'])
-
-        if cookie.get('path', None):
-            cookie_str += '; Path=%s' % cookie['path']
-        if cookie.get('domain', None):
-            cookie_str += '; Domain=%s' % cookie['domain']
-
-        return cookie_str
-
     def _get_request_cookies(self, jar, request):
         if isinstance(request.cookies, dict):
             cookie_list = [{'name': k, 'value': v} for k, v in \
@@ -81,8 +91,4 @@ class CookiesMiddleware(object):
         else:
             cookie_list = request.cookies
 
-        cookies = map(self._format_cookie, cookie_list)
-        headers = {'Set-Cookie': cookies}
-        response = Response(request.url, headers=headers)
-
-        return jar.make_cookies(response, request)
+        return jar.make_cookies_from_dicts(cookie_list, request)
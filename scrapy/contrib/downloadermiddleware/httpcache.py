@@ -1,7 +1,9 @@
 from email.utils import formatdate
+from twisted.internet import defer
 from scrapy import signals
 from scrapy.exceptions import NotConfigured, IgnoreRequest
 from scrapy.utils.misc import load_object
+from scrapy.contrib.httpcache import ThreadedCacheStorage
 
 
 class HttpCacheMiddleware(object):
@@ -11,7 +13,10 @@ class HttpCacheMiddleware(object):
             raise NotConfigured
         self.policy = load_object(settings['HTTPCACHE_POLICY'])(settings)
         self.storage = load_object(settings['HTTPCACHE_STORAGE'])(settings)
+        if settings.getbool('HTTPCACHE_ASYNC'):
+            self.storage = ThreadedCacheStorage(self.storage, settings)
         self.ignore_missing = settings.getbool('HTTPCACHE_IGNORE_MISSING')
+        self.replay = settings.getbool('HTTPCACHE_REPLAY')
         self.stats = stats
 
     @classmethod
@@ -25,7 +30,13 @@ class HttpCacheMiddleware(object):
         self.storage.open_spider(spider)
 
     def spider_closed(self, spider):
-        self.storage.close_spider(spider)
+        compressor = getattr(self.storage, 'compressor', None)
+        if compressor is not None and compressor.stats['raw_bytes']:
+            for key, value in compressor.stats.iteritems():
+                self.stats.set_value('httpcache/compression/%s' % key, value, spider=spider)
+            self.stats.set_value('httpcache/compression/ratio',
+                round(compressor.get_ratio(), 2), spider=spider)
+        return self.storage.close_spider(spider)
 
     def process_request(self, request, spider):
         # Skip uncacheable requests
@@ -35,6 +46,12 @@ class HttpCacheMiddleware(object):
 
         # Look for cached response and check if expired
         cachedresponse = self.storage.retrieve_response(spider, request)
+        if isinstance(cachedresponse, defer.Deferred):
+            return cachedresponse.addCallback(self._process_cached_response,
+                request, spider)
+        return self._process_cached_response(cachedresponse, request, spider)
+
+    def _process_cached_response(self, cachedresponse, request, spider):
         if cachedresponse is None:
             self.stats.inc_value('httpcache/miss', spider=spider)
             if self.ignore_missing:
@@ -42,9 +59,11 @@ class HttpCacheMiddleware(object):
                 raise IgnoreRequest("Ignored request not in cache: %s" % request)
             return  # first time request
 
-        # Return cached response only if not expired
+        # Return cached response only if not expired. When replaying, cached
+        # responses are never revalidated, so cache hits never reach the
+        # downloader slots (and their delays)
         cachedresponse.flags.append('cached')
-        if self.policy.is_cached_response_fresh(cachedresponse, request):
+        if self.replay or self.policy.is_cached_response_fresh(cachedresponse, request):
             self.stats.inc_value('httpcache/hit', spider=spider)
             return cachedresponse
 
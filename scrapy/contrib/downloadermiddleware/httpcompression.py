@@ -9,12 +9,15 @@ from scrapy.exceptions import NotConfigured
 class HttpCompressionMiddleware(object):
     """This middleware allows compressed (gzip, deflate) traffic to be
     sent/received from web sites"""
-    
+
+    def __init__(self, stats=None):
+        self.stats = stats
+
     @classmethod
     def from_crawler(cls, crawler):
         if not crawler.settings.getbool('COMPRESSION_ENABLED'):
             raise NotConfigured
-        return cls()
+        return cls(crawler.stats)
     
     def process_request(self, request, spider):
         request.headers.setdefault('Accept-Encoding', 'x-gzip,gzip,deflate')
@@ -25,6 +28,10 @@ class HttpCompressionMiddleware(object):
             if content_encoding:
                 encoding = content_encoding.pop()
                 decoded_body = self._decode(response.body, encoding.lower())
+                if self.stats:
+                    self.stats.inc_value('httpcompression/response_count', spider=spider)
+                    self.stats.inc_value('httpcompression/response_bytes',
+                        len(decoded_body), spider=spider)
                 respcls = responsetypes.from_args(headers=response.headers, \
                     url=response.url)
                 kwargs = dict(cls=respcls, body=decoded_body)
@@ -1,32 +1,91 @@
+from twisted.web.http import RESPONSES
+
 from scrapy.exceptions import NotConfigured
-from scrapy.utils.request import request_httprepr
-from scrapy.utils.response import response_httprepr
+from scrapy.utils.httpobj import urlparse_cached
+
+
+def _headers_size(headers):
+    # each header line is sent as "name: value\r\n"
+    return sum(len(key) + len(str(value)) + 4 for key, values in headers.iteritems()
+               for value in values)
+
+
+def get_request_size(request):
+    """Return the size (in bytes) of the raw HTTP representation of the given
+    request, without building it. This is only used as a fallback for download
+    handlers which don't report the bytes sent through the transport.
+    """
+    parsed = urlparse_cached(request)
+    path = parsed.path or '/'
+    if parsed.params:
+        path += ';' + parsed.params
+    if parsed.query:
+        path += '?' + parsed.query
+    size = len(request.method) + len(path) + 12 # "GET / HTTP/1.1\r\n"
+    size += len(parsed.hostname or '') + 8 # "Host: ...\r\n"
+    size += _headers_size(request.headers) + 2 + len(request.body)
+    return size
+
+
+def get_response_size(response):
+    """Return the size (in bytes) of the raw HTTP representation of the given
+    response, without building it. This is only used as a fallback for download
+    handlers which don't report the bytes received through the transport.
+    """
+    size = len(str(response.status)) + len(RESPONSES.get(response.status, '')) + 12
+    size += _headers_size(response.headers) + 2 + len(response.body)
+    return size
+
 
 class DownloaderStats(object):
 
-    def __init__(self, stats):
+    def __init__(self, stats, per_slot=False):
         self.stats = stats
+        self.per_slot = per_slot
 
     @classmethod
     def from_crawler(cls, crawler):
         if not crawler.settings.getbool('DOWNLOADER_STATS'):
             raise NotConfigured
-        return cls(crawler.stats)
+        return cls(crawler.stats, crawler.settings.getbool('DOWNLOADER_STATS_PER_SLOT'))
 
     def process_request(self, request, spider):
         self.stats.inc_value('downloader/request_count', spider=spider)
         self.stats.inc_value('downloader/request_method_count/%s' % request.method, spider=spider)
-        reqlen = len(request_httprepr(request))
-        self.stats.inc_value('downloader/request_bytes', reqlen, spider=spider)
+        # discard byte counts left over from a previous download of this
+        # request (ie. copies made by the retry or redirect middlewares)
+        request.meta.pop('download_bytes_sent', None)
+        request.meta.pop('download_bytes_received', None)
 
     def process_response(self, request, response, spider):
         self.stats.inc_value('downloader/response_count', spider=spider)
         self.stats.inc_value('downloader/response_status_count/%s' % response.status, spider=spider)
-        reslen = len(response_httprepr(response))
-        self.stats.inc_value('downloader/response_bytes', reslen, spider=spider)
+        self._inc_request_bytes(request, spider)
+        reslen = request.meta.get('download_bytes_received')
+        if reslen is None:
+            reslen = get_response_size(response)
+        self._inc_bytes('response_bytes', reslen, request, spider)
         return response
 
     def process_exception(self, request, exception, spider):
         ex_class = "%s.%s" % (exception.__class__.__module__, exception.__class__.__name__)
         self.stats.inc_value('downloader/exception_count', spider=spider)
         self.stats.inc_value('downloader/exception_type_count/%s' % ex_class, spider=spider)
+        # only count the requests actually sent by the download handler, not
+        # those dropped before (ie. by IgnoreRequest from other middlewares)
+        reqlen = request.meta.get('download_bytes_sent')
+        if reqlen is not None:
+            self._inc_bytes('request_bytes', reqlen, request, spider)
+
+    def _inc_request_bytes(self, request, spider):
+        reqlen = request.meta.get('download_bytes_sent')
+        if reqlen is None:
+            reqlen = get_request_size(request)
+        self._inc_bytes('request_bytes', reqlen, request, spider)
+
+    def _inc_bytes(self, key, count, request, spider):
+        self.stats.inc_value('downloader/%s' % key, count, spider=spider)
+        slot = request.meta.get('download_slot')
+        if self.per_slot and slot is not None:
+            self.stats.inc_value('downloader/slot/%s/%s' % (slot, key), count,
+                spider=spider)
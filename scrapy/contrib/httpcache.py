@@ -1,14 +1,24 @@
 import os
+import glob
+import shutil
+import zlib
+import struct
+import sqlite3
+import threading
 import cPickle as pickle
 from time import time
 from weakref import WeakKeyDictionary
 from email.utils import mktime_tz, parsedate_tz
 from w3lib.http import headers_raw_to_dict, headers_dict_to_raw
+from twisted.internet import defer, reactor, task, threads
+from twisted.python.threadpool import ThreadPool
+from scrapy import log
 from scrapy.http import Headers
 from scrapy.responsetypes import responsetypes
 from scrapy.utils.request import request_fingerprint
 from scrapy.utils.project import data_path
 from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.datatypes import LRUCache
 
 
 class DummyPolicy(object):
@@ -158,17 +168,138 @@ class RFC2616Policy(object):
         return currentage
 
 
+class CacheCompressor(object):
+    """Compress cached data with zlib, using a preset dictionary trained from
+    the first responses stored for each spider, so that markup repeated in
+    all pages of a site (ie. page templates) is compressed away.
+
+    The dictionary is emulated by priming a raw deflate stream with it and
+    copying the stream state for every compressed value, since the zlib
+    module doesn't support preset dictionaries directly. Values compressed
+    with the dictionary start with its adler32 checksum, so that they're not
+    decompressed with another one (eg. retrained after its file was removed).
+    """
+
+    dict_size = 32 * 1024 # the deflate window size
+    train_samples = 16
+
+    def __init__(self, dictpath=None, train=True, level=6):
+        self.dictpath = dictpath
+        self.train = train
+        self.level = level
+        self.stats = {'raw_bytes': 0, 'compressed_bytes': 0,
+            'compress_time': 0.0, 'decompress_time': 0.0}
+        self._samples = []
+        self._primed = None
+        self._lock = threading.Lock()
+        if dictpath and os.path.exists(dictpath):
+            with open(dictpath, 'rb') as f:
+                self._prime(f.read())
+
+    def compress(self, data, sample=True):
+        """Compress the given data. Unless sample is False, it may also be
+        used to train the dictionary, so values of different kinds (eg.
+        response headers and bodies) shouldn't be sampled together."""
+        start = time()
+        if self._primed is None:
+            if sample and self.dictpath and self.train:
+                self._train(data)
+            c = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+            compressed = 'Z' + c.compress(data) + c.flush()
+        else:
+            c, _, dictid = self._primed
+            c = c.copy()
+            compressed = 'D' + dictid + c.compress(data) + c.flush()
+        # the compressor may be used from several threads, see
+        # ThreadedCacheStorage
+        with self._lock:
+            self.stats['compress_time'] += time() - start
+            self.stats['raw_bytes'] += len(data)
+            self.stats['compressed_bytes'] += len(compressed)
+        return compressed
+
+    def decompress(self, data):
+        """Return the decompressed data, or None if it was compressed with a
+        dictionary which isn't available (eg. its file was removed)"""
+        start = time()
+        if data[0] == 'D':
+            dictid = data[1:5]
+            if self._primed is None or self._primed[2] != dictid:
+                log.msg(format='Cached data compressed with a missing dictionary: %(dictpath)s',
+                        level=log.WARNING, dictpath=self.dictpath)
+                return
+            d = self._primed[1].copy()
+            data = data[5:]
+        else:
+            d = zlib.decompressobj(-15)
+            data = data[1:]
+        decompressed = d.decompress(data) + d.flush()
+        with self._lock:
+            self.stats['decompress_time'] += time() - start
+        return decompressed
+
+    @classmethod
+    def is_compressed(cls, data):
+        return data[:1] in ('Z', 'D')
+
+    def get_ratio(self):
+        if not self.stats['compressed_bytes']:
+            return 0.0
+        return float(self.stats['raw_bytes']) / self.stats['compressed_bytes']
+
+    def _train(self, data):
+        with self._lock:
+            if self._primed is None:
+                self._train_sample(data)
+
+    def _train_sample(self, data):
+        self._samples.append(data)
+        if len(self._samples) < self.train_samples:
+            return
+        # use the lines found in most of the samples, placing the most
+        # frequent ones at the end, where they can be referenced with the
+        # shortest distances
+        counts = {}
+        for sample in self._samples:
+            for line in set(sample.splitlines(True)):
+                counts[line] = counts.get(line, 0) + 1
+        self._samples = []
+        lines = [l for l, n in counts.iteritems() if n > self.train_samples / 2]
+        lines.sort(key=lambda l: (counts[l], l))
+        zdict = ''.join(lines)[-self.dict_size:]
+        if zdict:
+            dirname = os.path.dirname(self.dictpath)
+            if not os.path.exists(dirname):
+                os.makedirs(dirname)
+            with open(self.dictpath, 'wb') as f:
+                f.write(zdict)
+            self._prime(zdict)
+
+    def _prime(self, zdict):
+        c = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        prefix = c.compress(zdict) + c.flush(zlib.Z_SYNC_FLUSH)
+        d = zlib.decompressobj(-15)
+        d.decompress(prefix)
+        dictid = struct.pack('>I', zlib.adler32(zdict) & 0xffffffff)
+        self._primed = c, d, dictid
+
+
 class DbmCacheStorage(object):
 
     def __init__(self, settings):
         self.cachedir = data_path(settings['HTTPCACHE_DIR'], createdir=True)
         self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
         self.dbmodule = __import__(settings['HTTPCACHE_DBM_MODULE'], {}, {}, [''])
+        self.compression = settings.getbool('HTTPCACHE_COMPRESSION')
+        self.compression_dict = settings.getbool('HTTPCACHE_COMPRESSION_DICT')
         self.db = None
+        self.compressor = None
 
     def open_spider(self, spider):
         dbpath = os.path.join(self.cachedir, '%s.db' % spider.name)
         self.db = self.dbmodule.open(dbpath, 'c')
+        dictpath = os.path.join(self.cachedir, '%s.zdict' % spider.name)
+        self.compressor = CacheCompressor(dictpath, train=self.compression_dict)
 
     def close_spider(self, spider):
         self.db.close()
@@ -193,9 +324,30 @@ class DbmCacheStorage(object):
             'headers': dict(response.headers),
             'body': response.body,
         }
-        self.db['%s_data' % key] = pickle.dumps(data, protocol=2)
+        data = pickle.dumps(data, protocol=2)
+        if self.compression:
+            data = self.compressor.compress(data)
+        self.db['%s_data' % key] = data
         self.db['%s_time' % key] = str(time())
 
+    def prune(self):
+        """Delete the expired responses and return how many were deleted"""
+        if self.expiration_secs <= 0:
+            return 0
+        now = time()
+        expired = [k[:-5] for k in self.db.keys() if k.endswith('_time') and
+            now - float(self.db[k]) > self.expiration_secs]
+        for key in expired:
+            del self.db['%s_data' % key]
+            del self.db['%s_time' % key]
+        return len(expired)
+
+    def compact(self):
+        """Reclaim the space of the deleted responses, if the DBM module
+        supports it"""
+        if hasattr(self.db, 'reorganize'):
+            self.db.reorganize()
+
     def _read_data(self, spider, request):
         key = self._request_key(request)
         db = self.db
@@ -207,7 +359,12 @@ class DbmCacheStorage(object):
         if 0 < self.expiration_secs < time() - float(ts):
             return  # expired
 
-        return pickle.loads(db['%s_data' % key])
+        data = db['%s_data' % key]
+        if CacheCompressor.is_compressed(data):
+            data = self.compressor.decompress(data)
+            if data is None:
+                return  # compressed with a missing dictionary
+        return pickle.loads(data)
 
     def _request_key(self, request):
         return request_fingerprint(request)
@@ -218,9 +375,14 @@ class FilesystemCacheStorage(object):
     def __init__(self, settings):
         self.cachedir = data_path(settings['HTTPCACHE_DIR'])
         self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
+        self.compression = settings.getbool('HTTPCACHE_COMPRESSION')
+        self.compression_dict = settings.getbool('HTTPCACHE_COMPRESSION_DICT')
+        self.compressor = None
 
     def open_spider(self, spider):
-        pass
+        self._spider_name = spider.name
+        dictpath = os.path.join(self.cachedir, spider.name, 'zdict')
+        self.compressor = CacheCompressor(dictpath, train=self.compression_dict)
 
     def close_spider(self, spider):
         pass
@@ -235,6 +397,11 @@ class FilesystemCacheStorage(object):
             body = f.read()
         with open(os.path.join(rpath, 'response_headers'), 'rb') as f:
             rawheaders = f.read()
+        if metadata.get('compressed'):
+            body = self.compressor.decompress(body)
+            rawheaders = self.compressor.decompress(rawheaders)
+            if body is None or rawheaders is None:
+                return  # compressed with a missing dictionary
         url = metadata.get('response_url')
         status = metadata['status']
         headers = Headers(headers_raw_to_dict(rawheaders))
@@ -254,18 +421,36 @@ class FilesystemCacheStorage(object):
             'response_url': response.url,
             'timestamp': time(),
         }
+        files = {
+            'response_headers': headers_dict_to_raw(response.headers),
+            'response_body': response.body,
+            'request_headers': headers_dict_to_raw(request.headers),
+            'request_body': request.body,
+        }
+        if self.compression:
+            metadata['compressed'] = True
+            for name, data in files.items():
+                files[name] = self.compressor.compress(data,
+                    sample=(name == 'response_body'))
         with open(os.path.join(rpath, 'meta'), 'wb') as f:
             f.write(repr(metadata))
         with open(os.path.join(rpath, 'pickled_meta'), 'wb') as f:
             pickle.dump(metadata, f, protocol=2)
-        with open(os.path.join(rpath, 'response_headers'), 'wb') as f:
-            f.write(headers_dict_to_raw(response.headers))
-        with open(os.path.join(rpath, 'response_body'), 'wb') as f:
-            f.write(response.body)
-        with open(os.path.join(rpath, 'request_headers'), 'wb') as f:
-            f.write(headers_dict_to_raw(request.headers))
-        with open(os.path.join(rpath, 'request_body'), 'wb') as f:
-            f.write(request.body)
+        for name, data in files.iteritems():
+            with open(os.path.join(rpath, name), 'wb') as f:
+                f.write(data)
+
+    def prune(self):
+        """Delete the expired responses and return how many were deleted"""
+        if self.expiration_secs <= 0:
+            return 0
+        now = time()
+        expired = 0
+        for rpath in glob.glob(os.path.join(self.cachedir, self._spider_name, '*', '*')):
+            if now - os.stat(rpath).st_mtime > self.expiration_secs:
+                shutil.rmtree(rpath)
+                expired += 1
+        return expired
 
     def _get_request_path(self, spider, request):
         key = request_fingerprint(request)
@@ -283,6 +468,478 @@ class FilesystemCacheStorage(object):
             return pickle.load(f)
 
 
+class SegmentCacheStorage(object):
+    """Log-structured cache storage. Responses are appended to large segment
+    files and located through an on-disk index (a DBM database keyed by
+    request fingerprint), so storing a response takes one write and
+    retrieving it takes one read. Since the index doesn't record accesses,
+    the oldest responses are evicted first when the cache exceeds its maximum
+    size, whatever the eviction policy.
+    """
+
+    compact_ratio = 0.5
+
+    _record_header = struct.Struct('>40sdI') # fingerprint, timestamp, length
+    _index_entry = struct.Struct('>IQId') # segment, offset, length, timestamp
+    _garbage_key = '_garbage'
+
+    def __init__(self, settings):
+        self.cachedir = data_path(settings['HTTPCACHE_DIR'], createdir=True)
+        self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
+        self.dbmodule = __import__(settings['HTTPCACHE_DBM_MODULE'], {}, {}, [''])
+        self.segment_size = settings.getint('HTTPCACHE_SEGMENT_SIZE')
+        self.max_size = settings.getint('HTTPCACHE_MAX_SIZE')
+        self.compression = settings.getbool('HTTPCACHE_COMPRESSION')
+        self.compression_dict = settings.getbool('HTTPCACHE_COMPRESSION_DICT')
+        self.index = None
+        self.compressor = None
+        self._writer = None
+
+    def open_spider(self, spider):
+        self.segdir = os.path.join(self.cachedir, spider.name)
+        if not os.path.exists(self.segdir):
+            os.makedirs(self.segdir)
+        self.index = self.dbmodule.open(os.path.join(self.segdir, 'index.db'), 'c')
+        self.compressor = CacheCompressor(os.path.join(self.segdir, 'zdict'),
+            train=self.compression_dict)
+        self.garbage = 0
+        if self._garbage_key in self.index:
+            self.garbage = int(self.index[self._garbage_key])
+        self.size = self._segments_size() - self.garbage
+        self._readers = {}
+        segments = self._segments()
+        self._open_writer(segments[-1] if segments else 1)
+
+    def close_spider(self, spider):
+        if self.garbage > self.compact_ratio * self._segments_size():
+            self.compact()
+        self._close_files()
+        self.index[self._garbage_key] = str(self.garbage)
+        self.index.close()
+
+    def retrieve_response(self, spider, request):
+        data = self._read_data(spider, request)
+        if data is None:
+            return  # not cached
+        url = data['url']
+        status = data['status']
+        headers = Headers(data['headers'])
+        body = data['body']
+        respcls = responsetypes.from_args(headers=headers, url=url)
+        response = respcls(url=url, headers=headers, status=status, body=body)
+        return response
+
+    def store_response(self, spider, request, response):
+        key = self._request_key(request)
+        data = {
+            'status': response.status,
+            'url': response.url,
+            'headers': dict(response.headers),
+            'body': response.body,
+        }
+        data = pickle.dumps(data, protocol=2)
+        if self.compression:
+            data = self.compressor.compress(data)
+        self._append(key, data, time())
+        if 0 < self.max_size < self.size:
+            # only the index is updated here, the space of the evicted entries
+            # is reclaimed when compacting (see close_spider)
+            self.evict()
+
+    def evict(self):
+        """Drop the oldest entries from the index until the cache size is
+        10% below its maximum size, and return how many were dropped. Their
+        space is reclaimed on the next compaction."""
+        entries = []
+        for key in self.index.keys():
+            if key != self._garbage_key:
+                segment, offset, length, ts = self._index_entry.unpack(self.index[key])
+                entries.append((ts, key, length))
+        entries.sort()
+        target = self.max_size * 0.9
+        evicted = 0
+        for ts, key, length in entries:
+            if self.size <= target:
+                break
+            self._drop(key, length)
+            evicted += 1
+        return evicted
+
+    def prune(self):
+        """Drop the expired entries, and the entries exceeding the maximum
+        cache size, from the index and return how many were dropped"""
+        pruned = 0
+        if self.expiration_secs > 0:
+            now = time()
+            for key in self.index.keys():
+                if key == self._garbage_key:
+                    continue
+                segment, offset, length, ts = self._index_entry.unpack(self.index[key])
+                if now - ts > self.expiration_secs:
+                    self._drop(key, length)
+                    pruned += 1
+        if 0 < self.max_size < self.size:
+            pruned += self.evict()
+        return pruned
+
+    def compact(self):
+        """Rewrite the live entries into new segments, dropping overwritten
+        and expired entries, and remove the old segments"""
+        oldsegments = self._segments()
+        self._open_writer(oldsegments[-1] + 1 if oldsegments else 1)
+        now = time()
+        for key in self.index.keys():
+            if key == self._garbage_key:
+                continue
+            segment, offset, length, ts = self._index_entry.unpack(self.index[key])
+            if 0 < self.expiration_secs < now - ts:
+                del self.index[key]
+            else:
+                record = self._read_record(segment, offset, length)
+                self._write_record(key, record, ts)
+        self._close_files()
+        if hasattr(self.index, 'sync'):
+            self.index.sync()
+        for segment in oldsegments:
+            os.remove(self._segment_path(segment))
+        self.garbage = 0
+        self.size = self._segments_size()
+        self._open_writer(self._segments()[-1])
+
+    def _read_data(self, spider, request):
+        key = self._request_key(request)
+        if key not in self.index:
+            return  # not found
+
+        segment, offset, length, ts = self._index_entry.unpack(self.index[key])
+        if 0 < self.expiration_secs < time() - ts:
+            return  # expired
+
+        data = self._read_record(segment, offset, length)
+        if CacheCompressor.is_compressed(data):
+            data = self.compressor.decompress(data)
+            if data is None:
+                return  # compressed with a missing dictionary
+        return pickle.loads(data)
+
+    def _append(self, key, data, ts):
+        if key in self.index:
+            self._drop(key, self._index_entry.unpack(self.index[key])[2])
+        self._write_record(key, data, ts)
+        self.size += self._record_header.size + len(data)
+
+    def _drop(self, key, length):
+        del self.index[key]
+        self.garbage += self._record_header.size + length
+        self.size -= self._record_header.size + length
+
+    def _write_record(self, key, data, ts):
+        if self._writer.tell() >= self.segment_size:
+            self._open_writer(self._writer_segment + 1)
+        offset = self._writer.tell() + self._record_header.size
+        self._writer.write(self._record_header.pack(key, ts, len(data)) + data)
+        self._writer.flush()
+        self.index[key] = self._index_entry.pack(self._writer_segment, offset,
+            len(data), ts)
+
+    def _read_record(self, segment, offset, length):
+        f = self._readers.get(segment)
+        if f is None:
+            f = self._readers[segment] = open(self._segment_path(segment), 'rb')
+        f.seek(offset)
+        return f.read(length)
+
+    def _open_writer(self, segment):
+        if self._writer is not None:
+            self._writer.close()
+        self._writer_segment = segment
+        self._writer = open(self._segment_path(segment), 'ab')
+        self._writer.seek(0, os.SEEK_END)
+
+    def _close_files(self):
+        for f in self._readers.values():
+            f.close()
+        self._readers = {}
+        self._writer.close()
+        self._writer = None
+
+    def _segment_path(self, segment):
+        return os.path.join(self.segdir, '%08d.seg' % segment)
+
+    def _segments(self):
+        paths = glob.glob(os.path.join(self.segdir, '*.seg'))
+        return sorted(int(os.path.basename(p)[:-4]) for p in paths)
+
+    def _segments_size(self):
+        return sum(os.path.getsize(self._segment_path(s)) for s in self._segments())
+
+    def _request_key(self, request):
+        return request_fingerprint(request)
+
+
+class SqliteCacheStorage(object):
+    """Cache storage backed by a SQLite database (one per spider) in WAL
+    mode, with a single row per response. Writes are committed in batches,
+    periodically, and expired responses can be pruned through an index on the
+    response timestamp. The size and last access time of each response are
+    kept to evict responses when the cache exceeds its maximum size.
+    """
+
+    def __init__(self, settings):
+        self.cachedir = data_path(settings['HTTPCACHE_DIR'], createdir=True)
+        self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
+        self.commit_interval = settings.getfloat('HTTPCACHE_SQLITE_COMMIT_INTERVAL')
+        self.compression = settings.getbool('HTTPCACHE_COMPRESSION')
+        self.compression_dict = settings.getbool('HTTPCACHE_COMPRESSION_DICT')
+        self.max_size = settings.getint('HTTPCACHE_MAX_SIZE')
+        self.eviction_policy = settings['HTTPCACHE_EVICTION_POLICY']
+        self.conn = None
+        self.compressor = None
+        self.size = 0
+        self._commit_loop = None
+        self._pending = 0
+        self._lock = threading.RLock()
+
+    def open_spider(self, spider):
+        dbpath = os.path.join(self.cachedir, '%s.sqlite' % spider.name)
+        # the connection may be used from the threads of ThreadedCacheStorage
+        self.conn = sqlite3.connect(dbpath, check_same_thread=False)
+        self.conn.text_factory = str
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS responses ('
+            'fingerprint TEXT PRIMARY KEY, timestamp REAL, status INTEGER, '
+            'url TEXT, headers BLOB, body BLOB, compressed INTEGER, '
+            'size INTEGER, accessed REAL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_timestamp '
+            'ON responses (timestamp)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed '
+            'ON responses (accessed)')
+        self.conn.commit()
+        self.size = self.conn.execute('SELECT COALESCE(SUM(size), 0) '
+            'FROM responses').fetchone()[0]
+        dictpath = os.path.join(self.cachedir, '%s.zdict' % spider.name)
+        self.compressor = CacheCompressor(dictpath, train=self.compression_dict)
+        if self.commit_interval:
+            self._commit_loop = task.LoopingCall(self.commit)
+            self._commit_loop.start(self.commit_interval, now=False)
+
+    def close_spider(self, spider):
+        if self._commit_loop and self._commit_loop.running:
+            self._commit_loop.stop()
+        self.commit()
+        self.conn.close()
+
+    def retrieve_response(self, spider, request):
+        with self._lock:
+            row = self._read_row(spider, request)
+            if row is not None:
+                self.touch_response(spider, request)
+        if row is None:
+            return  # not cached
+        status, url, rawheaders, body, compressed = row
+        rawheaders, body = str(rawheaders), str(body)
+        if compressed:
+            rawheaders = self.compressor.decompress(rawheaders)
+            body = self.compressor.decompress(body)
+            if body is None or rawheaders is None:
+                return  # compressed with a missing dictionary
+        headers = Headers(headers_raw_to_dict(rawheaders))
+        respcls = responsetypes.from_args(headers=headers, url=url)
+        response = respcls(url=url, headers=headers, status=status, body=body)
+        return response
+
+    def store_response(self, spider, request, response):
+        rawheaders = headers_dict_to_raw(response.headers)
+        body = response.body
+        if self.compression:
+            rawheaders = self.compressor.compress(rawheaders, sample=False)
+            body = self.compressor.compress(body)
+        key = self._request_key(request)
+        size = len(rawheaders) + len(body)
+        now = time()
+        with self._lock:
+            row = self.conn.execute('SELECT size FROM responses WHERE fingerprint = ?',
+                (key,)).fetchone()
+            self.conn.execute('INSERT OR REPLACE INTO responses VALUES '
+                '(?, ?, ?, ?, ?, ?, ?, ?, ?)', (key, now, response.status,
+                response.url, sqlite3.Binary(rawheaders), sqlite3.Binary(body),
+                self.compression, size, now))
+            self.size += size - (row[0] if row else 0)
+            self._pending += 1
+            if 0 < self.max_size < self.size:
+                self.evict()
+            if not self.commit_interval:
+                self.commit()
+
+    def touch_response(self, spider, request):
+        """Record an access to the cached response of the given request"""
+        if self.eviction_policy != 'lru':
+            return
+        with self._lock:
+            self.conn.execute('UPDATE responses SET accessed = ? '
+                'WHERE fingerprint = ?', (time(), self._request_key(request)))
+            self._pending += 1
+
+    def commit(self):
+        """Commit the responses stored since the last commit"""
+        with self._lock:
+            if self._pending:
+                self.conn.commit()
+                self._pending = 0
+
+    def evict(self):
+        """Delete the least recently used responses (or the oldest ones,
+        depending on the eviction policy) until the cache size is 10% below
+        its maximum size, and return how many were deleted"""
+        column = 'accessed' if self.eviction_policy == 'lru' else 'timestamp'
+        target = self.max_size * 0.9
+        with self._lock:
+            evicted = []
+            cursor = self.conn.execute('SELECT fingerprint, size FROM responses '
+                'ORDER BY %s' % column)
+            for key, size in cursor:
+                if self.size <= target:
+                    break
+                evicted.append((key,))
+                self.size -= size
+            cursor.close()
+            self.conn.executemany('DELETE FROM responses WHERE fingerprint = ?', evicted)
+            self._pending += 1
+        return len(evicted)
+
+    def prune(self):
+        """Delete the expired responses, and the responses exceeding the
+        maximum cache size, and return how many were deleted"""
+        pruned = 0
+        with self._lock:
+            if self.expiration_secs > 0:
+                cursor = self.conn.execute('DELETE FROM responses WHERE timestamp < ?',
+                    (time() - self.expiration_secs,))
+                pruned = cursor.rowcount
+                self.size = self.conn.execute('SELECT COALESCE(SUM(size), 0) '
+                    'FROM responses').fetchone()[0]
+            if 0 < self.max_size < self.size:
+                pruned += self.evict()
+            self.conn.commit()
+            self._pending = 0
+        return pruned
+
+    def compact(self):
+        """Reclaim the space of the deleted responses"""
+        with self._lock:
+            self.conn.commit()
+            self._pending = 0
+            self.conn.execute('VACUUM')
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def _read_row(self, spider, request):
+        query = 'SELECT status, url, headers, body, compressed FROM responses ' \
+            'WHERE fingerprint = ?'
+        args = (self._request_key(request),)
+        if self.expiration_secs > 0:
+            query += ' AND timestamp >= ?'
+            args += (time() - self.expiration_secs,)
+        return self.conn.execute(query, args).fetchone()
+
+    def _request_key(self, request):
+        return request_fingerprint(request)
+
+
+class ThreadedCacheStorage(object):
+    """Wrap a cache storage to perform its reads and writes in a bounded
+    thread pool, returning Deferreds, and keep the most recently used entries
+    in memory. Calls to storages which aren't thread safe (ie. those without a
+    true ``thread_safe`` attribute) are serialized. Accesses to entries kept in
+    memory are reported to storages which record them, through their
+    ``touch_response`` method.
+    """
+
+    def __init__(self, storage, settings):
+        self.storage = storage
+        self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
+        self.threadpool = ThreadPool(minthreads=1,
+            maxthreads=settings.getint('HTTPCACHE_ASYNC_THREADS'), name='httpcache')
+        self.entries = LRUCache(settings.getint('HTTPCACHE_ASYNC_LRU_SIZE'))
+        self._lock = None if getattr(storage, 'thread_safe', False) else threading.Lock()
+        self._writes = set()
+        self._shutdown_trigger = None
+
+    @property
+    def compressor(self):
+        return getattr(self.storage, 'compressor', None)
+
+    def open_spider(self, spider):
+        self.storage.open_spider(spider)
+        self.threadpool.start()
+        # don't keep the reactor from stopping if the spider isn't closed
+        self._shutdown_trigger = reactor.addSystemEventTrigger('during',
+            'shutdown', self._shutdown_threadpool)
+
+    def close_spider(self, spider):
+        dfd = defer.DeferredList(list(self._writes))
+        dfd.addBoth(lambda _: self._call(self.storage.close_spider, spider))
+        dfd.addBoth(self._stop_threadpool)
+        return dfd
+
+    def retrieve_response(self, spider, request):
+        key = request_fingerprint(request)
+        if key in self.entries:
+            ts, response = self.entries[key]
+            if not (0 < self.expiration_secs < time() - ts):
+                if hasattr(self.storage, 'touch_response'):
+                    self._track_write(self._call(self.storage.touch_response,
+                        spider, request), spider)
+                return defer.succeed(response.copy())
+            del self.entries[key]
+        dfd = self._call(self.storage.retrieve_response, spider, request)
+        if self.expiration_secs <= 0:
+            # entries with unknown age can only be kept when they don't expire
+            dfd.addCallback(self._keep_entry, key, time())
+        return dfd
+
+    def store_response(self, spider, request, response):
+        key = request_fingerprint(request)
+        ts = time()
+        dfd = self._call(self.storage.store_response, spider, request, response)
+        # the response is only served from memory once it's actually stored
+        dfd.addCallback(lambda _: self._keep_entry(response, key, ts))
+        return self._track_write(dfd, spider)
+
+    def _track_write(self, dfd, spider):
+        dfd.addErrback(log.err, 'Error storing response in the HTTP cache',
+            spider=spider)
+        self._writes.add(dfd)
+        dfd.addBoth(lambda _: self._writes.discard(dfd))
+        return dfd
+
+    def _keep_entry(self, response, key, ts):
+        if response is not None:
+            self.entries[key] = ts, response.copy()
+        return response
+
+    def _call(self, f, *args):
+        if self._lock is not None:
+            return threads.deferToThreadPool(reactor, self.threadpool,
+                self._call_locked, f, *args)
+        return threads.deferToThreadPool(reactor, self.threadpool, f, *args)
+
+    def _call_locked(self, f, *args):
+        with self._lock:
+            return f(*args)
+
+    def _stop_threadpool(self, result):
+        if self._shutdown_trigger is not None:
+            reactor.removeSystemEventTrigger(self._shutdown_trigger)
+        self._shutdown_threadpool()
+        return result
+
+    def _shutdown_threadpool(self):
+        self._shutdown_trigger = None
+        if not self.threadpool.joined:
+            self.threadpool.stop()
+
+
 def parse_cachecontrol(header):
     """Parse Cache-Control header
 
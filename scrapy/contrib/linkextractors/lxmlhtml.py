@@ -2,10 +2,18 @@
 Link extractor based on lxml.html
 """
 
-import lxml.html
+from urlparse import urljoin
+
+from lxml import etree
+from w3lib.url import safe_url_string
 
 from scrapy.link import Link
+from scrapy.linkextractor import FilteringLinkExtractor, _hashable
+from scrapy.selector.lxmldocument import LxmlDocument
+from scrapy.selector.lxmlsel import compile_xpath
+from scrapy.utils.misc import arg_to_iter
 from scrapy.utils.python import unique as unique_list
+from scrapy.utils.response import get_base_url
 
 class LxmlParserLinkExtractor(object):
     def __init__(self, tag="a", attr="href", process=None, unique=False):
@@ -14,23 +22,65 @@ class LxmlParserLinkExtractor(object):
         self.process_attr = process if callable(process) else lambda v: v
         self.unique = unique
 
-        self.links = []
-
-    def _extract_links(self, response_text, response_url):
-        html = lxml.html.fromstring(response_text)
-        html.make_links_absolute(response_url)
-        for e, a, l, p in html.iterlinks():
-            if self.scan_tag(e.tag):
-                if self.scan_attr(a):
-                    link = Link(self.process_attr(l), text=e.text)
-                    self.links.append(link)
-
-        links = unique_list(self.links, key=lambda link: link.url) \
-                if self.unique else self.links
+    def _iter_links(self, document):
+        for el in document.iter(etree.Element):
+            if not self.scan_tag(el.tag):
+                continue
+            for attrib, attr_val in el.items():
+                if self.scan_attr(attrib):
+                    yield el, attrib, attr_val
 
+    def _extract_links(self, selector_roots, response_url, response_encoding, base_url):
+        links = []
+        for root in selector_roots:
+            for el, attr, attr_val in self._iter_links(root):
+                url = self.process_attr(attr_val)
+                if url is None:
+                    continue
+                if isinstance(url, unicode):
+                    url = url.encode(response_encoding)
+                url = safe_url_string(urljoin(base_url, url), response_encoding)
+                text = u''.join(el.itertext()).strip()
+                links.append(Link(url, text, nofollow=el.get('rel') == 'nofollow'))
         return links
 
     def extract_links(self, response):
-        return self._extract_links(response.body, response.url)
+        return self._process_links(self._extract_links([LxmlDocument(response)],
+            response.url, response.encoding, get_base_url(response)))
+
+    def _process_links(self, links):
+        return unique_list(links, key=lambda link: link.url) if self.unique else links
+
+
+class LxmlLinkExtractor(FilteringLinkExtractor):
+    """Link extractor with the same features and arguments as
+    SgmlLinkExtractor, which walks the lxml document shared with the
+    selectors of the response instead of parsing it again."""
 
+    def __init__(self, allow=(), deny=(), allow_domains=(), deny_domains=(), restrict_xpaths=(),
+                 tags=('a', 'area'), attrs=('href',), canonicalize=True, unique=True, process_value=None,
+                 deny_extensions=None):
+        FilteringLinkExtractor.__init__(self, allow=allow, deny=deny,
+                                        allow_domains=allow_domains,
+                                        deny_domains=deny_domains,
+                                        restrict_xpaths=restrict_xpaths,
+                                        canonicalize=canonicalize,
+                                        unique=unique,
+                                        deny_extensions=deny_extensions)
+        self._cache_key = (self.__class__, self.restrict_xpaths, _hashable(tags),
+                           _hashable(attrs), process_value)
+        tags, attrs = set(arg_to_iter(tags)), set(arg_to_iter(attrs))
+        self.link_extractor = LxmlParserLinkExtractor(tag=lambda x: x in tags,
+                                                      attr=lambda x: x in attrs,
+                                                      process=process_value)
 
+    def _parse_links(self, response):
+        root = LxmlDocument(response)
+        if self.restrict_xpaths:
+            roots = [subroot for x in self.restrict_xpaths
+                     for subroot in compile_xpath(x)(root)
+                     if isinstance(subroot, etree._Element)]
+        else:
+            roots = [root]
+        return self.link_extractor._extract_links(roots, response.url,
+            response.encoding, get_base_url(response))
@@ -11,7 +11,7 @@ from scrapy.item import Item
 from scrapy.selector import HtmlXPathSelector
 from scrapy.utils.misc import arg_to_iter, extract_regex
 from scrapy.utils.python import flatten
-from .common import wrap_loader_context
+from .common import wrap_loader_context, takes_loader_context
 from .processor import Identity
 
 class ItemLoader(object):
@@ -26,6 +26,10 @@ class ItemLoader(object):
         self.item = context['item'] = item
         self.context = context
         self._values = defaultdict(list)
+        # input and output processors of each field (and whether they
+        # receive the loader context), see _processor()
+        self._input_processors = {}
+        self._output_processors = {}
 
     def add_value(self, field_name, value, *processors, **kw):
         value = self.get_value(value, *processors, **kw)
@@ -77,9 +81,11 @@ class ItemLoader(object):
         return item
 
     def get_output_value(self, field_name):
-        proc = self.get_output_processor(field_name)
-        proc = wrap_loader_context(proc, self.context)
+        proc, with_context = self._processor(field_name, self._output_processors,
+                                             self.get_output_processor)
         try:
+            if with_context:
+                return proc(self._values[field_name], loader_context=self.context)
             return proc(self._values[field_name])
         except Exception, e:
             raise ValueError("Error with output processor: field=%r value=%r error='%s: %s'" % \
@@ -103,10 +109,21 @@ class ItemLoader(object):
         return proc
 
     def _process_input_value(self, field_name, value):
-        proc = self.get_input_processor(field_name)
-        proc = wrap_loader_context(proc, self.context)
+        proc, with_context = self._processor(field_name, self._input_processors,
+                                             self.get_input_processor)
+        if with_context:
+            return proc(value, loader_context=self.context)
         return proc(value)
 
+    def _processor(self, field_name, processors, get_processor):
+        # processors are looked up only once per field
+        try:
+            return processors[field_name]
+        except KeyError:
+            proc = get_processor(field_name)
+            processors[field_name] = proc, takes_loader_context(proc)
+            return processors[field_name]
+
     def _get_item_field_attr(self, field_name, key, default=None):
         if isinstance(self.item, Item):
             value = self.item.fields[field_name].get(key, default)
@@ -142,5 +159,5 @@ class XPathItemLoader(ItemLoader):
 
     def _get_values(self, xpaths, **kw):
         xpaths = arg_to_iter(xpaths)
-        return flatten([self.selector.select(xpath).extract() for xpath in xpaths])
+        return [v for xpath in xpaths for v in self.selector.select_extract(xpath)]
 
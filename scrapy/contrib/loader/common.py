@@ -1,13 +1,39 @@
 """Common functions used in Item Loaders code"""
 
+import inspect
+import weakref
 from functools import partial
 from scrapy.utils.python import get_func_args
 
+# whether callables receive loader_context, by function, method function or
+# (for other callables) class, as that's all get_func_args() depends on
+_takes_context = weakref.WeakKeyDictionary()
+
+def takes_loader_context(function):
+    """Return True if the given function receives the loader_context
+    argument, or False otherwise"""
+    if inspect.isfunction(function) or inspect.isclass(function):
+        key = function
+    elif inspect.ismethod(function):
+        key = function.__func__
+    else:
+        key = function.__class__
+    try:
+        return _takes_context[key]
+    except (KeyError, TypeError):
+        pass
+    takes = 'loader_context' in get_func_args(function)
+    try:
+        _takes_context[key] = takes
+    except TypeError: # not weakly referenceable
+        pass
+    return takes
+
 def wrap_loader_context(function, context):
     """Wrap functions that receive loader_context to contain the context
     "pre-loaded" and expose a interface that receives only one argument
     """
-    if 'loader_context' in get_func_args(function):
+    if takes_loader_context(function):
         return partial(function, loader_context=context)
     else:
         return function
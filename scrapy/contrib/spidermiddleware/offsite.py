@@ -9,6 +9,7 @@ import re
 from scrapy import signals
 from scrapy.http import Request
 from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.url import DomainIndex
 from scrapy import log
 
 class OffsiteMiddleware(object):
@@ -35,18 +36,18 @@ class OffsiteMiddleware(object):
 
     def should_follow(self, request, spider):
         regex = self.host_regex
-        # hostanme can be None for wrong urls (like javascript links)
+        # hostname can be None for wrong urls (like javascript links)
         host = urlparse_cached(request).hostname or ''
         return bool(regex.search(host))
 
     def get_host_regex(self, spider):
-        """Override this method to implement a different offsite policy"""
+        """Override this method to implement a different offsite policy. It
+        must return a regex, or any object with a search(host) method"""
         allowed_domains = getattr(spider, 'allowed_domains', None)
         if not allowed_domains:
             return re.compile('') # allow all by default
-        domains = [d.replace('.', r'\.') for d in allowed_domains]
-        regex = r'^(.*\.)?(%s)$' % '|'.join(domains)
-        return re.compile(regex)
+        # matches the same hosts as r'^(.*\.)?(domain1|domain2|...)$'
+        return DomainIndex(allowed_domains)
 
     def spider_opened(self, spider):
         self.host_regex = self.get_host_regex(spider)
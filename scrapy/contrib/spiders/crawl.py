@@ -52,7 +52,7 @@ class CrawlSpider(BaseSpider):
             links = [l for l in rule.link_extractor.extract_links(response) if l not in seen]
             if links and rule.process_links:
                 links = rule.process_links(links)
-            seen = seen.union(links)
+            seen.update(links)
             for link in links:
                 r = Request(url=link.url, callback=self._response_downloaded)
                 r.meta.update(rule=n, link_text=link.text)
@@ -7,7 +7,7 @@ See documentation in docs/topics/spiders.rst
 from scrapy.spider import BaseSpider
 from scrapy.item import BaseItem
 from scrapy.http import Request
-from scrapy.utils.iterators import xmliter, csviter
+from scrapy.utils.iterators import xmliter, xmliter_lxml, csviter
 from scrapy.utils.spider import iterate_spider_output
 from scrapy.selector import XmlXPathSelector, HtmlXPathSelector
 from scrapy.exceptions import NotConfigured, NotSupported
@@ -18,9 +18,11 @@ class XMLFeedSpider(BaseSpider):
     This class intends to be the base class for spiders that scrape
     from XML feeds.
 
-    You can choose whether to parse the file using the 'iternodes' iterator, an
-    'xml' selector, or an 'html' selector.  In most cases, it's convenient to
-    use iternodes, since it's a faster and cleaner.
+    You can choose whether to parse the file using the 'iternodes' iterator,
+    the 'iterparse' iterator, an 'xml' selector, or an 'html' selector.  In most
+    cases, it's convenient to use iternodes, since it's a faster and cleaner,
+    or iterparse for big feeds, since its memory usage doesn't grow with the
+    feed size.
     """
 
     iterator = 'iternodes'
@@ -70,6 +72,8 @@ class XMLFeedSpider(BaseSpider):
         response = self.adapt_response(response)
         if self.iterator == 'iternodes':
             nodes = self._iternodes(response)
+        elif self.iterator == 'iterparse':
+            nodes = self._iterparse(response)
         elif self.iterator == 'xml':
             selector = XmlXPathSelector(response)
             self._register_namespaces(selector)
@@ -88,6 +92,13 @@ class XMLFeedSpider(BaseSpider):
             self._register_namespaces(node)
             yield node
 
+    def _iterparse(self, response):
+        prefix, _, nodename = self.itertag.rpartition(':')
+        namespace = dict(self.namespaces)[prefix] if prefix else None
+        for node in xmliter_lxml(response, nodename, namespace, prefix or 'x'):
+            self._register_namespaces(node)
+            yield node
+
     def _register_namespaces(self, selector):
         for (prefix, uri) in self.namespaces:
             selector.register_namespace(prefix, uri)
@@ -103,6 +114,7 @@ class CSVFeedSpider(BaseSpider):
 
     delimiter = None # When this is None, python's csv module's default delimiter is used
     headers = None
+    batch_size = None # When set, rows are passed to parse_batch in lists of this size
 
     def process_results(self, response, results):
         """This method has the same purpose as the one in XMLFeedSpider"""
@@ -116,12 +128,29 @@ class CSVFeedSpider(BaseSpider):
         """This method must be overriden with your custom spider functionality"""
         raise NotImplementedError
 
+    def parse_batch(self, response, rows):
+        """Receives a response and a list of rows (of up to batch_size rows)
+        and returns the results of parsing them. By default, it calls parse_row
+        for each row; override it to process rows in bulk.
+        """
+        for row in rows:
+            for result_item in iterate_spider_output(self.parse_row(response, row)):
+                yield result_item
+
     def parse_rows(self, response):
         """Receives a response and a dict (representing each row) with a key for
         each provided (or detected) header of the CSV file.  This spider also
         gives the opportunity to override adapt_response and
         process_results methods for pre and post-processing purposes.
         """
+        if self.batch_size:
+            batches = csviter(response, self.delimiter, self.headers,
+                              batch_size=self.batch_size)
+            for rows in batches:
+                ret = self.parse_batch(response, rows)
+                for result_item in self.process_results(response, ret):
+                    yield result_item
+            return
 
         for row in csviter(response, self.delimiter, self.headers):
             ret = self.parse_row(response, row)
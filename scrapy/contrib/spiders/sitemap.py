@@ -1,9 +1,10 @@
 import re
+from cStringIO import StringIO
 
 from scrapy.spider import BaseSpider
 from scrapy.http import Request, XmlResponse
 from scrapy.utils.sitemap import Sitemap, sitemap_urls_from_robots
-from scrapy.utils.gz import gunzip, is_gzipped
+from scrapy.utils.gz import GunzipReader, is_gzipped
 from scrapy import log
 
 class SitemapSpider(BaseSpider):
@@ -11,6 +12,7 @@ class SitemapSpider(BaseSpider):
     sitemap_urls = ()
     sitemap_rules = [('', 'parse')]
     sitemap_follow = ['']
+    sitemap_max_size = 50 * 1024 * 1024 # uncompressed, as per the sitemaps protocol
 
     def __init__(self, *a, **kw):
         super(SitemapSpider, self).__init__(*a, **kw)
@@ -29,13 +31,13 @@ class SitemapSpider(BaseSpider):
             for url in sitemap_urls_from_robots(response.body):
                 yield Request(url, callback=self._parse_sitemap)
         else:
-            body = self._get_sitemap_body(response)
-            if body is None:
+            stream = self._get_sitemap_stream(response)
+            if stream is None:
                 log.msg(format="Ignoring invalid sitemap: %(response)s",
                         level=log.WARNING, spider=self, response=response)
                 return
 
-            s = Sitemap(body)
+            s = Sitemap(stream, max_size=self.sitemap_max_size)
             if s.type == 'sitemapindex':
                 for loc in iterloc(s):
                     if any(x.search(loc) for x in self._follow):
@@ -46,19 +48,32 @@ class SitemapSpider(BaseSpider):
                         if r.search(loc):
                             yield Request(loc, callback=c)
                             break
+            if s.truncated:
+                log.msg(format="Sitemap larger than %(max_size)d bytes, ignored the "
+                        "rest of it: %(response)s", level=log.WARNING, spider=self,
+                        max_size=self.sitemap_max_size, response=response)
 
-    def _get_sitemap_body(self, response):
-        """Return the sitemap body contained in the given response, or None if the
+    def _get_sitemap_stream(self, response):
+        """Return a file-like object to read the sitemap contained in the given
+        response from (decompressing it while it's read), or None if the
         response is not a sitemap.
         """
         if isinstance(response, XmlResponse):
-            return response.body
+            return StringIO(response.body)
         elif is_gzipped(response):
-            return gunzip(response.body)
+            return GunzipReader(response.body)
         elif response.url.endswith('.xml'):
-            return response.body
+            return StringIO(response.body)
         elif response.url.endswith('.xml.gz'):
-            return gunzip(response.body)
+            return GunzipReader(response.body)
+
+    def _get_sitemap_body(self, response):
+        """Return the sitemap body contained in the given response, or None if the
+        response is not a sitemap.
+        """
+        stream = self._get_sitemap_stream(response)
+        if stream is not None:
+            return stream.read()
 
 def regex(x):
     if isinstance(x, basestring):
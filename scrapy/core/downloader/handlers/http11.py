@@ -49,21 +49,24 @@ class ScrapyAgent(object):
         self._bindAddress = bindAddress
         self._pool = pool
 
-    def _get_agent(self, request, timeout):
+    def _get_agent(self, request, timeout, bytes_sent):
         bindaddress = request.meta.get('bindaddress') or self._bindAddress
         proxy = request.meta.get('proxy')
         if proxy:
             scheme, _, host, port, _ = _parse(proxy)
             endpoint = TCP4ClientEndpoint(reactor, host, port, timeout=timeout,
                 bindAddress=bindaddress)
-            return self._ProxyAgent(endpoint)
+            pool = _SentBytesPool(HTTPConnectionPool(reactor, persistent=False),
+                request, bytes_sent)
+            return self._ProxyAgent(endpoint, pool=pool)
 
+        pool = _SentBytesPool(self._pool or HTTPConnectionPool(reactor,
+            persistent=False), request, bytes_sent)
         return self._Agent(reactor, contextFactory=self._contextFactory,
-            connectTimeout=timeout, bindAddress=bindaddress, pool=self._pool)
+            connectTimeout=timeout, bindAddress=bindaddress, pool=pool)
 
     def download_request(self, request):
         timeout = request.meta.get('download_timeout') or self._connectTimeout
-        agent = self._get_agent(request, timeout)
 
         # request details
         url = urldefrag(request.url)[0]
@@ -71,6 +74,9 @@ class ScrapyAgent(object):
         headers = TxHeaders(request.headers)
         bodyproducer = _RequestBodyProducer(request.body) if request.body else None
 
+        bytes_sent = _request_size(request, url, headers)
+        agent = self._get_agent(request, timeout, bytes_sent)
+
         start_time = time()
         d = agent.request(method, url, headers, bodyproducer)
         # set download latency
@@ -109,10 +115,65 @@ class ScrapyAgent(object):
         txresponse, body, flags = result
         status = int(txresponse.code)
         headers = Headers(txresponse.headers.getAllRawHeaders())
+        request.meta['download_bytes_received'] = _response_size(txresponse, body)
         respcls = responsetypes.from_args(headers=headers, url=url)
         return respcls(url=url, status=status, headers=headers, body=body, flags=flags)
 
 
+def _headers_size(txheaders):
+    # each header line is sent as "name: value\r\n"
+    return sum(len(name) + len(value) + 4
+               for name, values in txheaders.getAllRawHeaders()
+               for value in values)
+
+
+def _request_size(request, url, txheaders):
+    """Return the number of bytes written to the transport for the given
+    request, as serialized by the HTTP/1.1 client protocol"""
+    scheme, netloc, host, port, path = _parse(url)
+    if request.meta.get('proxy'):
+        path = url
+    size = len(request.method) + len(path) + 12 + _headers_size(txheaders) + 2
+    if not txheaders.hasHeader('host'):
+        size += len(netloc) + 8
+    if request.body:
+        size += len('Content-Length: %d\r\n' % len(request.body))
+        size += len(request.body)
+    return size
+
+
+def _response_size(txresponse, body):
+    """Return the number of bytes received for the given response, not
+    counting the chunked transfer-encoding framing (if any)"""
+    version = '%s/%d.%d' % txresponse.version
+    size = len(version) + len(str(txresponse.code)) + len(txresponse.phrase) + 4
+    return size + _headers_size(txresponse.headers) + 2 + len(body)
+
+
+class _SentBytesPool(object):
+    """Wrapper of a connection pool which reports the bytes sent for the
+    given request once a connection is obtained for it, since the agent writes
+    the request to the connection right away. Requests which fail to connect
+    (ie. DNS errors or refused connections) aren't reported as sent."""
+
+    def __init__(self, pool, request, bytes_sent):
+        self._pool = pool
+        self._request = request
+        self._bytes_sent = bytes_sent
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+    def getConnection(self, key, endpoint):
+        d = self._pool.getConnection(key, endpoint)
+        d.addCallback(self._connected)
+        return d
+
+    def _connected(self, connection):
+        self._request.meta['download_bytes_sent'] = self._bytes_sent
+        return connection
+
+
 class _RequestBodyProducer(object):
     implements(IBodyProducer)
 
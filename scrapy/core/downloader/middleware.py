@@ -4,6 +4,8 @@ Downloader Middleware manager
 See documentation in docs/topics/downloader-middleware.rst
 """
 
+from twisted.internet import defer
+
 from scrapy.http import Request, Response
 from scrapy.middleware import MiddlewareManager
 from scrapy.utils.defer import mustbe_deferred
@@ -27,30 +29,59 @@ class DownloaderMiddlewareManager(MiddlewareManager):
             self.methods['process_exception'].insert(0, mw.process_exception)
 
     def download(self, download_func, request, spider):
-        def process_request(request):
-            for method in self.methods['process_request']:
-                response = method(request=request, spider=spider)
-                assert response is None or isinstance(response, (Response, Request)), \
-                        'Middleware %s.process_request must return None, Response or Request, got %s' % \
-                        (method.im_self.__class__.__name__, response.__class__.__name__)
+        # middleware methods may return Deferreds, in which case the methods
+        # after them are chained to the Deferred, otherwise they're called
+        # right away
+        def process_request(request, start=0):
+            methods = self.methods['process_request']
+            for index in xrange(start, len(methods)):
+                response = methods[index](request=request, spider=spider)
+                if isinstance(response, defer.Deferred):
+                    return response.addCallback(resume_request, index)
+                check_request_result(response, index)
                 if response:
                     return response
             return download_func(request=request, spider=spider)
 
-        def process_response(response):
+        def resume_request(response, index):
+            check_request_result(response, index)
+            if response:
+                return response
+            return process_request(request, index + 1)
+
+        def check_request_result(response, index):
+            method = self.methods['process_request'][index]
+            assert response is None or isinstance(response, (Response, Request)), \
+                    'Middleware %s.process_request must return None, Response or Request, got %s' % \
+                    (method.im_self.__class__.__name__, response.__class__.__name__)
+
+        def process_response(response, start=0):
             assert response is not None, 'Received None in process_response'
             if isinstance(response, Request):
                 return response
 
-            for method in self.methods['process_response']:
-                response = method(request=request, response=response, spider=spider)
-                assert isinstance(response, (Response, Request)), \
-                    'Middleware %s.process_response must return Response or Request, got %s' % \
-                    (method.im_self.__class__.__name__, type(response))
+            methods = self.methods['process_response']
+            for index in xrange(start, len(methods)):
+                response = methods[index](request=request, response=response, spider=spider)
+                if isinstance(response, defer.Deferred):
+                    return response.addCallback(resume_response, index)
+                check_response_result(response, index)
                 if isinstance(response, Request):
                     return response
             return response
 
+        def resume_response(response, index):
+            check_response_result(response, index)
+            if isinstance(response, Request):
+                return response
+            return process_response(response, index + 1)
+
+        def check_response_result(response, index):
+            method = self.methods['process_response'][index]
+            assert isinstance(response, (Response, Request)), \
+                'Middleware %s.process_response must return Response or Request, got %s' % \
+                (method.im_self.__class__.__name__, type(response))
+
         def process_exception(_failure):
             exception = _failure.value
             for method in self.methods['process_exception']:
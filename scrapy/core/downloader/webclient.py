@@ -38,14 +38,23 @@ class ScrapyHTTPPageGetter(HTTPClient):
 
         # Method command
         self.sendCommand(self.factory.method, self.factory.path)
+        sent = len(self.factory.method) + len(self.factory.path) + 12
         # Headers
         for key, values in self.factory.headers.items():
             for value in values:
                 self.sendHeader(key, value)
+                sent += len(key) + len(str(value)) + 4
         self.endHeaders()
+        sent += 2
         # Body
         if self.factory.body is not None:
             self.transport.write(self.factory.body)
+            sent += len(self.factory.body)
+        self.factory.bytes_sent = sent
+
+    def dataReceived(self, data):
+        self.factory.bytes_received += len(data)
+        return HTTPClient.dataReceived(self, data)
 
     def lineReceived(self, line):
         return HTTPClient.lineReceived(self, line.rstrip())
@@ -95,9 +104,12 @@ class ScrapyHTTPClientFactory(HTTPClientFactory):
         self.body = request.body or None
         self.headers = Headers(request.headers)
         self.response_headers = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
         self.timeout = request.meta.get('download_timeout') or timeout
         self.start_time = time()
-        self.deferred = defer.Deferred().addCallback(self._build_response, request)
+        self.deferred = defer.Deferred().addCallbacks(self._build_response,
+            self._download_failed, callbackArgs=(request,), errbackArgs=(request,))
 
         # Fixes Twisted 11.1.0+ support as HTTPClientFactory is expected
         # to have _disconnectedDeferred. See Twisted r32329.
@@ -120,11 +132,19 @@ class ScrapyHTTPClientFactory(HTTPClientFactory):
 
     def _build_response(self, body, request):
         request.meta['download_latency'] = self.headers_time-self.start_time
+        request.meta['download_bytes_sent'] = self.bytes_sent
+        request.meta['download_bytes_received'] = self.bytes_received
         status = int(self.status)
         headers = Headers(self.response_headers)
         respcls = responsetypes.from_args(headers=headers, url=self.url)
         return respcls(url=self.url, status=status, headers=headers, body=body)
 
+    def _download_failed(self, failure, request):
+        # report the bytes of requests sent before failing (ie. timed out)
+        if self.bytes_sent:
+            request.meta['download_bytes_sent'] = self.bytes_sent
+        return failure
+
     def _set_connection_attributes(self, request):
         parsed = urlparse_cached(request)
         self.scheme, self.netloc, self.host, self.port, self.path = _parsed_url_args(parsed)
@@ -1,12 +1,13 @@
 """This module implements the Scraper component which parses responses and
 extracts information from them"""
 
+from time import time
 from collections import deque
 
 from twisted.python.failure import Failure
-from twisted.internet import defer
+from twisted.internet import defer, task
 
-from scrapy.utils.defer import defer_result, defer_succeed, parallel, iter_errback
+from scrapy.utils.defer import defer_result, defer_succeed, iter_errback
 from scrapy.utils.spider import iterate_spider_output
 from scrapy.utils.misc import load_object
 from scrapy.exceptions import CloseSpider, DropItem
@@ -17,6 +18,34 @@ from scrapy.core.spidermw import SpiderMiddlewareManager
 from scrapy import log
 
 
+def _time_slice(seconds):
+    """Return a termination predicate factory for a Cooperator which ends
+    each of its iterations after the given number of seconds"""
+    def factory():
+        end = time() + seconds
+        return lambda: time() >= end
+    return factory
+
+
+class _OutputTimer(object):
+    """Iterator which measures the time spent getting each object from the
+    given iterator"""
+
+    def __init__(self, iterator):
+        self.iterator = iterator
+        self.elapsed = 0.0
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        start = time()
+        try:
+            return self.iterator.next()
+        finally:
+            self.elapsed += time() - start
+
+
 class Slot(object):
     """Scraper slot (one per running spider)"""
 
@@ -65,6 +94,10 @@ class Scraper(object):
         itemproc_cls = load_object(crawler.settings['ITEM_PROCESSOR'])
         self.itemproc = itemproc_cls.from_crawler(crawler)
         self.concurrent_items = crawler.settings.getint('CONCURRENT_ITEMS')
+        # the output of all the responses being scraped is iterated in turns
+        # by the same cooperator, for a limited time per reactor iteration
+        self.cooperator = task.Cooperator(terminationPredicateFactory= \
+            _time_slice(crawler.settings.getfloat('SCRAPER_TIME_SLICE')))
         self.crawler = crawler
         self.signals = crawler.signals
         self.logformatter = crawler.logformatter
@@ -153,10 +186,31 @@ class Scraper(object):
         if not result:
             return defer_succeed(None)
         it = iter_errback(result, self.handle_spider_error, request, response, spider)
-        dfd = parallel(it, self.concurrent_items,
-            self._process_spidermw_output, request, response, spider)
+        work = (self._process_spidermw_output(output, request, response, spider) \
+            for output in it)
+        timer = _OutputTimer(work)
+        dfd = defer.DeferredList([self.cooperator.coiterate(timer) \
+            for _ in xrange(self.concurrent_items)])
+        dfd.addCallback(self._output_finished, timer, request, response, spider)
         return dfd
 
+    def _output_finished(self, result, timer, request, response, spider):
+        """Record the time spent iterating the output of the callback (or
+        errback) which handled the given response"""
+        if isinstance(response, Response):
+            callback = request.callback or spider.parse
+        else:
+            callback = request.errback
+        if callback is None:
+            return result
+        name = getattr(callback, '__name__', None) or type(callback).__name__
+        stats = self.crawler.stats
+        stats.inc_value('scraper/callback_time/%s' % name, timer.elapsed,
+            spider=spider)
+        stats.max_value('scraper/callback_time_max/%s' % name, timer.elapsed,
+            spider=spider)
+        return result
+
     def _process_spidermw_output(self, output, request, response, spider):
         """Process each Request/Item (given in the output parameter) returned
         from the given spider
@@ -209,4 +263,3 @@ class Scraper(object):
             log.msg(spider=spider, **logkws)
             return self.signals.send_catch_log_deferred(signal=signals.item_scraped, \
                 item=output, response=response, spider=spider)
-
@@ -1,4 +1,5 @@
 import time
+from heapq import heapify, heappush, heappop
 from cookielib import CookieJar as _CookieJar, DefaultCookiePolicy, IPV4_RE
 from scrapy.utils.httpobj import urlparse_cached
 
@@ -6,8 +7,9 @@ from scrapy.utils.httpobj import urlparse_cached
 class CookieJar(object):
     def __init__(self, policy=None, check_expired_frequency=10000):
         self.policy = policy or DefaultCookiePolicy()
-        self.jar = _CookieJar(self.policy)
-        self.jar._cookies_lock = _DummyLock()
+        self.jar = _ExpiringCookieJar(self.policy)
+        # kept for backwards compatibility, expired cookies are now removed
+        # as soon as they expire (see _ExpiringCookieJar)
         self.check_expired_frequency = check_expired_frequency
         self.processed = 0
 
@@ -29,7 +31,7 @@ class CookieJar(object):
         if not IPV4_RE.search(req_host):
             hosts = potential_domain_matches(req_host)
             if req_host.find(".") == -1:
-                hosts += req_host + ".local"
+                hosts.append(req_host + ".local")
         else:
             hosts = [req_host]
 
@@ -44,9 +46,7 @@ class CookieJar(object):
                 wreq.add_unredirected_header("Cookie", "; ".join(attrs))
 
         self.processed += 1
-        if self.processed % self.check_expired_frequency == 0:
-            # This is still quite inefficient for large number of cookies
-            self.jar.clear_expired_cookies()
+        self.jar.clear_expired_cookies()
 
     @property
     def _cookies(self):
@@ -72,6 +72,25 @@ class CookieJar(object):
         wrsp = WrappedResponse(response)
         return self.jar.make_cookies(wrsp, wreq)
 
+    def make_cookies_from_dicts(self, cookies, request):
+        """Return the Cookie objects for the given cookie dicts (with name,
+        value and optional path and domain keys), as if they were sent in
+        Set-Cookie headers of a response to the given request"""
+        if not self.policy.netscape:
+            return []
+        attrs_set = []
+        for cookie in cookies:
+            attrs = [(_to_str(cookie['name']), _to_str(cookie['value']))]
+            if cookie.get('path', None):
+                attrs.append(('path', _to_str(cookie['path'])))
+            if cookie.get('domain', None):
+                attrs.append(('domain', _to_str(cookie['domain'])))
+            attrs.append(('version', '0'))
+            attrs_set.append(attrs)
+        cookies = self.jar._cookies_from_attrs_set(attrs_set, WrappedRequest(request))
+        self.jar._process_rfc2109_cookies(cookies)
+        return cookies
+
     def set_cookie(self, cookie):
         self.jar.set_cookie(cookie)
 
@@ -97,6 +116,11 @@ def potential_domain_matches(domain):
         pass
     return matches + ['.' + d for d in matches]
 
+def _to_str(value):
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    return str(value)
+
 class _DummyLock(object):
     def acquire(self):
         pass
@@ -105,6 +129,42 @@ class _DummyLock(object):
         pass
 
 
+class _ExpiringCookieJar(_CookieJar):
+    """cookielib CookieJar which keeps its cookies with an expiration time in
+    a heap, so expired cookies can be removed without scanning the whole jar"""
+
+    def __init__(self, policy=None):
+        _CookieJar.__init__(self, policy)
+        self._cookies_lock = _DummyLock()
+        self._expiry = []
+        self._expiry_limit = 1024
+
+    def set_cookie(self, cookie):
+        _CookieJar.set_cookie(self, cookie)
+        if cookie.expires is not None:
+            heappush(self._expiry, (cookie.expires, cookie.domain, cookie.path,
+                cookie.name))
+            if len(self._expiry) > self._expiry_limit:
+                # drop the entries of cookies that were replaced or removed
+                self._expiry = [(c.expires, c.domain, c.path, c.name) \
+                    for c in self if c.expires is not None]
+                heapify(self._expiry)
+                self._expiry_limit = max(1024, 2 * len(self._expiry))
+
+    def clear_expired_cookies(self):
+        now = time.time()
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            _, domain, path, name = heappop(expiry)
+            try:
+                cookie = self._cookies[domain][path][name]
+            except KeyError:
+                continue
+            # the cookie may have been replaced by one expiring later
+            if cookie.is_expired(now):
+                self.clear(domain, path, name)
+
+
 class WrappedRequest(object):
     """Wraps a scrapy Request class with methods defined by urllib2.Request class to interact with CookieJar class
 
@@ -2,6 +2,12 @@ from w3lib.http import headers_dict_to_raw
 from scrapy.utils.datatypes import CaselessDict
 
 
+# canonical (title-cased and interned) form of the header names seen so far,
+# shared by all the Headers of the process
+_normkey_cache = {}
+_normkey_cache_limit = 1000
+
+
 class Headers(CaselessDict):
     """Case insensitive http headers dictionary"""
 
@@ -11,12 +17,21 @@ class Headers(CaselessDict):
 
     def normkey(self, key):
         """Headers must not be unicode"""
+        try:
+            return _normkey_cache[key]
+        except KeyError:
+            pass
         if isinstance(key, unicode):
             return key.title().encode(self.encoding)
-        return key.title()
+        normkey = intern(key.title())
+        if len(_normkey_cache) < _normkey_cache_limit:
+            _normkey_cache[key] = normkey
+        return normkey
 
     def normvalue(self, value):
         """Headers must not be unicode"""
+        if isinstance(value, str):
+            return [value]
         if not hasattr(value, '__iter__'):
             value = [value]
         return [x.encode(self.encoding) if isinstance(x, unicode) else x \
@@ -24,19 +39,29 @@ class Headers(CaselessDict):
 
     def __getitem__(self, key):
         try:
-            return super(Headers, self).__getitem__(key)[-1]
+            return dict.__getitem__(self, self.normkey(key))[-1]
         except IndexError:
             return None
 
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, self.normkey(key), self.normvalue(value))
+
+    def __contains__(self, key):
+        return dict.__contains__(self, self.normkey(key))
+    has_key = __contains__
+
     def get(self, key, def_val=None):
         try:
-            return super(Headers, self).get(key, def_val)[-1]
-        except IndexError:
-            return None
+            value = dict.__getitem__(self, self.normkey(key))
+        except KeyError:
+            if def_val is None:
+                return None
+            value = self.normvalue(def_val)
+        return value[-1] if value else None
 
     def getlist(self, key, def_val=None):
         try:
-            return super(Headers, self).__getitem__(key)
+            return dict.__getitem__(self, self.normkey(key))
         except KeyError:
             if def_val is not None:
                 return self.normvalue(def_val)
@@ -53,20 +78,25 @@ class Headers(CaselessDict):
         lst.extend(self.normvalue(value))
         self[key] = lst
 
+    def update(self, seq):
+        if isinstance(seq, Headers):
+            # already normalized, only the value lists need to be copied
+            dict.update(self, ((k, list(v)) for k, v in dict.iteritems(seq)))
+        else:
+            super(Headers, self).update(seq)
+
     def items(self):
-        return list(self.iteritems())
+        return dict.items(self)
 
     def iteritems(self):
-        return ((k, self.getlist(k)) for k in self.keys())
+        return dict.iteritems(self)
 
     def values(self):
-        return [self[k] for k in self.keys()]
+        return [v[-1] if v else None for v in dict.itervalues(self)]
 
     def to_string(self):
         return headers_dict_to_raw(self)
 
     def __copy__(self):
-        return self.__class__(self)
+        return self.__class__(self, encoding=self.encoding)
     copy = __copy__
-
-
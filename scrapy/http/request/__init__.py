@@ -15,14 +15,24 @@ from scrapy.utils.decorator import deprecated
 from scrapy.utils.url import escape_ajax
 from scrapy.http.common import deprecated_setter
 
+# the characters left unchanged by safe_url_string(), urls made only of them
+# (like the ones of already built requests) don't need to be escaped again
+_safe_url_chars = ''.join(c for c in map(chr, range(128)) if safe_url_string(c) == c)
+
 class Request(object_ref):
 
+    # requests can be queued by the million, so they use slots, and their
+    # headers, cookies and meta are only created when first accessed
+    __slots__ = ['_encoding', 'method', '_url', '_body', 'priority',
+                 'callback', 'errback', '_cookies', '_headers', 'dont_filter',
+                 '_meta', '_cached_urlparse', '_fingerprints', '__weakref__']
+
     def __init__(self, url, callback=None, method='GET', headers=None, body=None, 
                  cookies=None, meta=None, encoding='utf-8', priority=0,
                  dont_filter=False, errback=None):
 
         self._encoding = encoding  # this one has to be set first
-        self.method = str(method).upper()
+        self.method = intern(str(method).upper())
         self._set_url(url)
         self._set_body(body)
         assert isinstance(priority, int), "Request priority not an integer: %r" % priority
@@ -32,8 +42,8 @@ class Request(object_ref):
         self.callback = callback
         self.errback = errback
 
-        self.cookies = cookies or {}
-        self.headers = Headers(headers or {}, encoding=encoding)
+        self._cookies = cookies or None
+        self._headers = Headers(headers, encoding=encoding) if headers else None
         self.dont_filter = dont_filter
 
         self._meta = dict(meta) if meta else None
@@ -44,12 +54,34 @@ class Request(object_ref):
             self._meta = {}
         return self._meta
 
+    def _get_headers(self):
+        if self._headers is None:
+            self._headers = Headers(encoding=self._encoding)
+        return self._headers
+
+    def _set_headers(self, headers):
+        self._headers = headers
+
+    headers = property(_get_headers, _set_headers)
+
+    def _get_cookies(self):
+        if self._cookies is None:
+            self._cookies = {}
+        return self._cookies
+
+    def _set_cookies(self, cookies):
+        self._cookies = cookies
+
+    cookies = property(_get_cookies, _set_cookies)
+
     def _get_url(self):
         return self._url
 
     def _set_url(self, url):
         if isinstance(url, str):
-            self._url = escape_ajax(safe_url_string(url))
+            if url.translate(None, _safe_url_chars) or '#!' in url:
+                url = escape_ajax(safe_url_string(url))
+            self._url = url
         elif isinstance(url, unicode):
             if self.encoding is None:
                 raise TypeError('Cannot convert unicode url - %s has no encoding' %
@@ -59,6 +91,10 @@ class Request(object_ref):
             raise TypeError('Request url must be str or unicode, got %s:' % type(url).__name__)
         if ':' not in self._url:
             raise ValueError('Missing scheme in request url: %s' % self._url)
+        # values derived from the url, see scrapy.utils.httpobj and
+        # scrapy.utils.request
+        self._cached_urlparse = None
+        self._fingerprints = None
 
     url = property(_get_url, deprecated_setter(_set_url, 'url'))
 
@@ -97,8 +133,12 @@ class Request(object_ref):
         """Create a new Request with the same attributes except for those
         given new values.
         """
-        for x in ['url', 'method', 'headers', 'body', 'cookies', 'meta', \
-                'encoding', 'priority', 'dont_filter', 'callback', 'errback']:
-            kwargs.setdefault(x, getattr(self, x))
-        cls = kwargs.pop('cls', self.__class__)
-        return cls(*args, **kwargs)
+        # the lazy attributes are copied without creating them
+        attrs = {'url': self.url, 'method': self.method, 'body': self.body,
+                 'encoding': self.encoding, 'priority': self.priority,
+                 'dont_filter': self.dont_filter, 'callback': self.callback,
+                 'errback': self.errback, 'headers': self._headers,
+                 'cookies': self._cookies, 'meta': self._meta}
+        attrs.update(kwargs)
+        cls = attrs.pop('cls', self.__class__)
+        return cls(*args, **attrs)
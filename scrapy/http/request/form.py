@@ -13,6 +13,8 @@ from scrapy.utils.python import unicode_to_str
 
 class FormRequest(Request):
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         formdata = kwargs.pop('formdata', None)
         if formdata and kwargs.get('method') is None:
@@ -13,6 +13,8 @@ from scrapy.http.common import deprecated_setter
 
 class Response(object_ref):
 
+    _cached_urlparse = None
+
     def __init__(self, url, status=200, headers=None, body='', flags=None, request=None):
         self.headers = Headers(headers or {})
         self.status = int(status)
@@ -35,6 +37,7 @@ class Response(object_ref):
     def _set_url(self, url):
         if isinstance(url, str):
             self._url = url
+            self._cached_urlparse = None
         else:
             raise TypeError('%s url must be str, got %s:' % (type(self).__name__, \
                 type(url).__name__))
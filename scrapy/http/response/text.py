@@ -5,11 +5,16 @@ discovering (through HTTP headers) to base Response class.
 See documentation in docs/topics/request-response.rst
 """
 
-from w3lib.encoding import html_to_unicode, resolve_encoding, \
+import codecs
+
+from w3lib.encoding import html_to_unicode, resolve_encoding, read_bom, \
     html_body_declared_encoding, http_content_type_encoding
 from scrapy.http.response import Response
+from scrapy.utils.datatypes import LocalCache
 from scrapy.utils.python import memoizemethod_noargs
 
+_content_type_encodings = LocalCache(1000)
+
 
 class TextResponse(Response):
 
@@ -26,9 +31,8 @@ class TextResponse(Response):
             if self.encoding is None:
                 raise TypeError('Cannot convert unicode url - %s has no encoding' %
                     type(self).__name__)
-            self._url = url.encode(self.encoding)
-        else:
-            super(TextResponse, self)._set_url(url)
+            url = url.encode(self.encoding)
+        super(TextResponse, self)._set_url(url)
 
     def _set_body(self, body):
         self._body = ''
@@ -65,26 +69,43 @@ class TextResponse(Response):
     @memoizemethod_noargs
     def _headers_encoding(self):
         content_type = self.headers.get('Content-Type')
-        return http_content_type_encoding(content_type)
+        try:
+            return _content_type_encodings[content_type]
+        except KeyError:
+            encoding = http_content_type_encoding(content_type)
+            _content_type_encodings[content_type] = encoding
+            return encoding
 
     def _body_inferred_encoding(self):
         if self._cached_benc is None:
-            content_type = self.headers.get('Content-Type')
-            benc, ubody = html_to_unicode(content_type, self.body, \
-                    auto_detect_fun=self._auto_detect_fun, \
-                    default_encoding=self._DEFAULT_ENCODING)
+            # the headers and the body declare no encoding (see encoding),
+            # so this doesn't need to decode the body like html_to_unicode
+            benc = read_bom(self.body)[0] or self._auto_detect_fun(self.body)
+            if benc is None:
+                content_type = self.headers.get('Content-Type')
+                benc, self._cached_ubody = html_to_unicode(content_type, \
+                    self.body, default_encoding=self._DEFAULT_ENCODING)
             self._cached_benc = benc
-            self._cached_ubody = ubody
         return self._cached_benc
 
     def _auto_detect_fun(self, text):
         for enc in (self._DEFAULT_ENCODING, 'utf-8', 'cp1252'):
-            try:
-                text.decode(enc)
-            except UnicodeError:
-                continue
-            return resolve_encoding(enc)
+            if _is_valid(text, enc):
+                return resolve_encoding(enc)
 
     @memoizemethod_noargs
     def _body_declared_encoding(self):
         return html_body_declared_encoding(self.body)
+
+
+def _is_valid(text, encoding, chunk_size=65536):
+    """Return whether the given text can be decoded with the given encoding,
+    decoding it a chunk at a time instead of as a whole"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        for i in xrange(0, len(text), chunk_size):
+            decoder.decode(text[i:i + chunk_size])
+        decoder.decode('', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
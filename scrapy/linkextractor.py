@@ -2,6 +2,15 @@
 Common code and definitions used by Link extractors (located in
 scrapy.contrib.linkextractor).
 """
+import re
+import weakref
+from urlparse import urlparse
+
+from scrapy.link import Link
+from scrapy.utils.misc import arg_to_iter
+from scrapy.utils.python import unique as unique_list
+from scrapy.utils.url import canonicalize_url, url_is_from_any_domain, url_has_any_extension, \
+    DomainIndex
 
 # common file extensions that are not followed if they occur in links
 IGNORED_EXTENSIONS = [
@@ -22,3 +31,80 @@ IGNORED_EXTENSIONS = [
     # other
     'css', 'pdf', 'doc', 'exe', 'bin', 'rss', 'zip', 'rar',
 ]
+
+
+_re_type = type(re.compile("", 0))
+
+_matches = lambda url, regexs: any((r.search(url) for r in regexs))
+_is_valid_url = lambda url: url.split('://', 1)[0] in set(['http', 'https', 'file'])
+
+# links found in each response, before filtering, shared by all the link
+# extractors which parse it the same way (ie. the rules of a CrawlSpider)
+_links_cache = weakref.WeakKeyDictionary()
+
+_hashable = lambda x: x if isinstance(x, basestring) or callable(x) else tuple(x)
+
+
+class FilteringLinkExtractor(object):
+    """Base class for the link extractors which filter the links found in
+    responses by url patterns, domains and extensions.
+
+    Subclasses implement ``_parse_links(response)``, which returns the links
+    found in the response, and set ``_cache_key`` to a hashable value which
+    identifies how they parse responses.
+    """
+
+    def __init__(self, allow=(), deny=(), allow_domains=(), deny_domains=(),
+                 restrict_xpaths=(), canonicalize=True, unique=True, deny_extensions=None):
+        self.allow_res = [x if isinstance(x, _re_type) else re.compile(x) for x in arg_to_iter(allow)]
+        self.deny_res = [x if isinstance(x, _re_type) else re.compile(x) for x in arg_to_iter(deny)]
+        self.allow_domains = DomainIndex(arg_to_iter(allow_domains))
+        self.deny_domains = DomainIndex(arg_to_iter(deny_domains))
+        self.restrict_xpaths = tuple(arg_to_iter(restrict_xpaths))
+        self.canonicalize = canonicalize
+        self.unique = unique
+        if deny_extensions is None:
+            deny_extensions = IGNORED_EXTENSIONS
+        self.deny_extensions = set(['.' + e for e in deny_extensions])
+
+    def extract_links(self, response):
+        cache = _links_cache.setdefault(response, {})
+        if self._cache_key not in cache:
+            cache[self._cache_key] = self._parse_links(response)
+        # filtering modifies the links (ie. when canonicalizing their url)
+        links = [Link(l.url, l.text, l.fragment, l.nofollow)
+                 for l in cache[self._cache_key]]
+        return self._process_links(links)
+
+    def _process_links(self, links):
+        links = [x for x in links if self._link_allowed(x)]
+        if self.unique:
+            links = unique_list(links, key=lambda link: link.url)
+        return links
+
+    def _link_allowed(self, link):
+        parsed_url = urlparse(link.url)
+        allowed = _is_valid_url(link.url)
+        if self.allow_res:
+            allowed &= _matches(link.url, self.allow_res)
+        if self.deny_res:
+            allowed &= not _matches(link.url, self.deny_res)
+        if self.allow_domains:
+            allowed &= url_is_from_any_domain(parsed_url, self.allow_domains)
+        if self.deny_domains:
+            allowed &= not url_is_from_any_domain(parsed_url, self.deny_domains)
+        if self.deny_extensions:
+            allowed &= not url_has_any_extension(parsed_url, self.deny_extensions)
+        if allowed and self.canonicalize:
+            link.url = canonicalize_url(parsed_url)
+        return allowed
+
+    def matches(self, url):
+        if self.allow_domains and not url_is_from_any_domain(url, self.allow_domains):
+            return False
+        if self.deny_domains and url_is_from_any_domain(url, self.deny_domains):
+            return False
+
+        allowed = [regex.search(url) for regex in self.allow_res] if self.allow_res else [True]
+        denied = [regex.search(url) for regex in self.deny_res] if self.deny_res else []
+        return any(allowed) and not any(denied)
@@ -4,6 +4,7 @@ based on different criterias.
 
 """
 
+import posixpath
 from mimetypes import MimeTypes
 from pkgutil import get_data
 from cStringIO import StringIO
@@ -11,6 +12,7 @@ from cStringIO import StringIO
 from scrapy.http import Response
 from scrapy.utils.misc import load_object
 from scrapy.utils.python import isbinarytext
+from scrapy.utils.datatypes import LocalCache
 
 class ResponseTypes(object):
 
@@ -31,6 +33,10 @@ class ResponseTypes(object):
 
     def __init__(self):
         self.classes = {}
+        # classes already found for content types and file extensions, which
+        # makes finding the class of most responses a couple of dict lookups
+        self._content_type_cache = LocalCache(1000)
+        self._filename_cache = LocalCache(1000)
         self.mimetypes = MimeTypes()
         mimedata = get_data('scrapy', 'mime.types')
         self.mimetypes.readfp(StringIO(mimedata))
@@ -52,8 +58,13 @@ class ResponseTypes(object):
         header """
         if content_encoding:
             return Response
-        mimetype = content_type.split(';')[0].strip().lower()
-        return self.from_mimetype(mimetype)
+        try:
+            return self._content_type_cache[content_type]
+        except KeyError:
+            mimetype = content_type.split(';')[0].strip().lower()
+            cls = self._content_type_cache[content_type] = \
+                self.from_mimetype(mimetype)
+            return cls
 
     def from_content_disposition(self, content_disposition):
         try:
@@ -67,15 +78,30 @@ class ResponseTypes(object):
         """Return the most appropiate Response class by looking at the HTTP
         headers"""
         cls = Response
-        if 'Content-Type' in headers:
-            cls = self.from_content_type(headers['Content-type'], \
+        content_type = headers.get('Content-Type')
+        if content_type:
+            cls = self.from_content_type(content_type, \
                 headers.get('Content-Encoding'))
-        if cls is Response and 'Content-Disposition' in headers:
-            cls = self.from_content_disposition(headers['Content-Disposition'])
+        if cls is Response:
+            content_disposition = headers.get('Content-Disposition')
+            if content_disposition:
+                cls = self.from_content_disposition(content_disposition)
         return cls
 
     def from_filename(self, filename):
         """Return the most appropiate Response class from a file name"""
+        if filename[:5].lower() == 'data:':
+            return self._from_filename(filename)
+        # the mime type is guessed only from the last two extensions
+        base, ext = posixpath.splitext(filename[filename.rfind('/') + 1:])
+        key = posixpath.splitext(base)[1] + ext
+        try:
+            return self._filename_cache[key]
+        except KeyError:
+            cls = self._filename_cache[key] = self._from_filename('file' + key)
+            return cls
+
+    def _from_filename(self, filename):
         mimetype, encoding = self.mimetypes.guess_type(filename)
         if mimetype and not encoding:
             return self.from_mimetype(mimetype)
@@ -90,9 +116,10 @@ class ResponseTypes(object):
         chunk = body[:5000]
         if isbinarytext(chunk):
             return self.from_mimetype('application/octet-stream')
-        elif "<html>" in chunk.lower():
+        chunk = chunk.lower()
+        if "<html>" in chunk:
             return self.from_mimetype('text/html')
-        elif "<?xml" in chunk.lower():
+        elif "<?xml" in chunk:
             return self.from_mimetype('text/xml')
         else:
             return self.from_mimetype('text')
@@ -52,6 +52,14 @@ class XPathSelector(object_ref):
         else:
             return XPathSelectorList([])
 
+    def select_extract(self, xpath):
+        return [x.extract() for x in self.select(xpath)]
+
+    def select_extract_first(self, xpath, default=None):
+        for x in self.select(xpath):
+            return x.extract()
+        return default
+
     def re(self, regex):
         return extract_regex(regex, self.extract())
 
@@ -1,4 +1,3 @@
-from scrapy.utils.python import flatten
 from scrapy.utils.decorator import deprecated
 
 class XPathSelectorList(list):
@@ -7,10 +6,20 @@ class XPathSelectorList(list):
         return self.__class__(list.__getslice__(self, i, j))
 
     def select(self, xpath):
-        return self.__class__(flatten([x.select(xpath) for x in self]))
+        return self.__class__([y for x in self for y in x.select(xpath)])
+
+    def select_extract(self, xpath):
+        return [y for x in self for y in x.select_extract(xpath)]
+
+    def select_extract_first(self, xpath, default=None):
+        for x in self:
+            y = x.select_extract_first(xpath)
+            if y is not None:
+                return y
+        return default
 
     def re(self, regex):
-        return flatten([x.re(regex) for x in self])
+        return [y for x in self for y in x.re(regex)]
 
     def extract(self):
         return [x.extract() for x in self]
@@ -3,6 +3,7 @@ This module contains a simple class (LxmlDocument) which provides cache and
 garbage collection to lxml element tree documents.
 """
 
+import codecs
 import weakref
 from lxml import etree
 from scrapy.utils.trackref import object_ref
@@ -10,11 +11,66 @@ from scrapy.utils.trackref import object_ref
 
 def _factory(response, parser_cls):
     url = response.url
+    body, encoding = _raw_body(response)
+    if body is not None:
+        parser = parser_cls(recover=True, encoding=encoding)
+        try:
+            root = etree.fromstring(body, parser=parser, base_url=url)
+        except etree.XMLSyntaxError:
+            pass
+        else:
+            # libxml2 doesn't replace invalid utf-8 sequences, it keeps them
+            # in the tree (which lxml then fails to decode)
+            if not any(e.type_name == 'ERR_INVALID_ENCODING' for e in parser.error_log):
+                return root
     body = response.body_as_unicode().strip().encode('utf8') or '<html/>'
     parser = parser_cls(recover=True, encoding='utf8')
     return etree.fromstring(body, parser=parser, base_url=url)
 
 
+def _raw_body(response):
+    """Return the response body and the libxml2 encoding to parse it with, if
+    it can be parsed as is, to avoid decoding and re-encoding it to utf-8.
+    Otherwise, return (None, None).
+    """
+    body = response.body
+    encoding = _libxml2_encoding(response.encoding)
+    if encoding is None or body.startswith(_BOMS):
+        return None, None
+    if body[:1].isspace():
+        body = body.lstrip()
+    if encoding != 'utf-8':
+        # libxml2 silently drops the rest of the document after an invalid
+        # byte, instead of replacing it
+        try:
+            body.decode(encoding)
+        except UnicodeDecodeError:
+            return None, None
+    return body or '<html/>', encoding
+
+
+_BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+_libxml2_encodings = {}
+
+def _libxml2_encoding(encoding):
+    """Return the name of the given (ascii compatible) encoding supported by
+    libxml2, or None if it's not supported"""
+    try:
+        return _libxml2_encodings[encoding]
+    except KeyError:
+        pass
+    try:
+        name = codecs.lookup(encoding).name
+        if name.startswith(('utf-16', 'utf-32')):
+            name = None
+        else:
+            etree.XMLParser(encoding=name)
+    except (LookupError, TypeError):
+        name = None
+    _libxml2_encodings[encoding] = name
+    return name
+
+
 class LxmlDocument(object_ref):
 
     cache = weakref.WeakKeyDictionary()
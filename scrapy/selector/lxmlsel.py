@@ -8,6 +8,7 @@ from scrapy.utils.misc import extract_regex
 from scrapy.utils.trackref import object_ref
 from scrapy.utils.python import unicode_to_str
 from scrapy.utils.decorator import deprecated
+from scrapy.utils.datatypes import LRUCache
 from scrapy.http import TextResponse
 from .lxmldocument import LxmlDocument
 from .list import XPathSelectorList
@@ -17,6 +18,41 @@ __all__ = ['HtmlXPathSelector', 'XmlXPathSelector', 'XPathSelector', \
            'XPathSelectorList']
 
 
+# compiled XPath expressions, shared by all selectors of the process
+xpath_cache = LRUCache(1000)
+xpath_cache_stats = {'hits': 0, 'misses': 0}
+
+def compile_xpath(xpath, namespaces=None):
+    """Return the etree.XPath evaluator for the given expression and
+    namespaces, compiling it only if it's not found in the XPath cache"""
+    key = (xpath, tuple(sorted(namespaces.iteritems())) if namespaces else None)
+    try:
+        compiled = xpath_cache[key]
+    except KeyError:
+        xpath_cache_stats['misses'] += 1
+        compiled = xpath_cache[key] = etree.XPath(xpath, namespaces=namespaces)
+    else:
+        xpath_cache_stats['hits'] += 1
+    return compiled
+
+
+def _extract(result, method):
+    """Return the given XPath result (a node, string, number or boolean)
+    serialized as unicode"""
+    if isinstance(result, basestring):
+        return unicode(result)
+    try:
+        return etree.tostring(result, method=method, encoding=unicode,
+                              with_tail=False)
+    except (AttributeError, TypeError):
+        if result is True:
+            return u'1'
+        elif result is False:
+            return u'0'
+        else:
+            return unicode(result)
+
+
 class XPathSelector(object_ref):
 
     __slots__ = ['response', 'text', 'namespaces', '_expr', '_root', '__weakref__']
@@ -35,38 +71,38 @@ class XPathSelector(object_ref):
         self._root = _root
         self._expr = _expr
 
-    def select(self, xpath):
-        try:
-            xpathev = self._root.xpath
-        except AttributeError:
-            return XPathSelectorList([])
+    def _select(self, xpath):
+        if not hasattr(self._root, 'xpath'):
+            return []
 
         try:
-            result = xpathev(xpath, namespaces=self.namespaces)
+            result = compile_xpath(xpath, self.namespaces)(self._root)
         except etree.XPathError:
             raise ValueError("Invalid XPath: %s" % xpath)
 
         if type(result) is not list:
             result = [result]
+        return result
 
+    def select(self, xpath):
         result = [self.__class__(_root=x, _expr=xpath, namespaces=self.namespaces)
-                  for x in result]
+                  for x in self._select(xpath)]
         return XPathSelectorList(result)
 
+    def select_extract(self, xpath):
+        method = self._tostring_method
+        return [_extract(x, method) for x in self._select(xpath)]
+
+    def select_extract_first(self, xpath, default=None):
+        for x in self._select(xpath):
+            return _extract(x, self._tostring_method)
+        return default
+
     def re(self, regex):
         return extract_regex(regex, self.extract())
 
     def extract(self):
-        try:
-            return etree.tostring(self._root, method=self._tostring_method, \
-                encoding=unicode, with_tail=False)
-        except (AttributeError, TypeError):
-            if self._root is True:
-                return u'1'
-            elif self._root is False:
-                return u'0'
-            else:
-                return unicode(self._root)
+        return _extract(self._root, self._tostring_method)
 
     def register_namespace(self, prefix, uri):
         if self.namespaces is None:
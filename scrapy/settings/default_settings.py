@@ -36,6 +36,7 @@ CONCURRENT_REQUESTS_PER_IP = 0
 
 COOKIES_ENABLED = True
 COOKIES_DEBUG = False
+COOKIES_JAR_IDLE_TIMEOUT = 0
 
 DEFAULT_ITEM_CLASS = 'scrapy.item.Item'
 
@@ -90,6 +91,7 @@ DOWNLOADER_MIDDLEWARES_BASE = {
 }
 
 DOWNLOADER_STATS = True
+DOWNLOADER_STATS_PER_SLOT = False
 
 DUPEFILTER_CLASS = 'scrapy.dupefilter.RFPDupeFilter'
 
@@ -141,11 +143,21 @@ FEED_EXPORTERS_BASE = {
 HTTPCACHE_ENABLED = False
 HTTPCACHE_DIR = 'httpcache'
 HTTPCACHE_IGNORE_MISSING = False
+HTTPCACHE_REPLAY = False
 HTTPCACHE_STORAGE = 'scrapy.contrib.httpcache.DbmCacheStorage'
 HTTPCACHE_EXPIRATION_SECS = 0
 HTTPCACHE_IGNORE_HTTP_CODES = []
 HTTPCACHE_IGNORE_SCHEMES = ['file']
 HTTPCACHE_DBM_MODULE = 'anydbm'
+HTTPCACHE_SEGMENT_SIZE = 256 * 1024 * 1024
+HTTPCACHE_MAX_SIZE = 0
+HTTPCACHE_EVICTION_POLICY = 'lru'
+HTTPCACHE_COMPRESSION = False
+HTTPCACHE_COMPRESSION_DICT = True
+HTTPCACHE_SQLITE_COMMIT_INTERVAL = 5
+HTTPCACHE_ASYNC = False
+HTTPCACHE_ASYNC_THREADS = 4
+HTTPCACHE_ASYNC_LRU_SIZE = 100
 HTTPCACHE_POLICY = 'scrapy.contrib.httpcache.DummyPolicy'
 
 ITEM_PROCESSOR = 'scrapy.contrib.pipeline.ItemPipelineManager'
@@ -200,6 +212,8 @@ RETRY_PRIORITY_ADJUST = -1
 
 ROBOTSTXT_OBEY = False
 
+SCRAPER_TIME_SLICE = 0.01
+
 SCHEDULER = 'scrapy.core.scheduler.Scheduler'
 SCHEDULER_DISK_QUEUE = 'scrapy.squeue.PickleLifoDiskQueue'
 SCHEDULER_MEMORY_QUEUE = 'scrapy.squeue.LifoMemoryQueue'
@@ -121,6 +121,10 @@ class MiscCommandsTest(CommandTest):
     def test_list(self):
         self.assertEqual(0, self.call('list'))
 
+    def test_prunecache(self):
+        self.assertEqual(0, self.call('prunecache', 'example.com',
+            '-s', 'HTTPCACHE_DIR=%s' % self.mktemp(), '--max-size', '1024'))
+
 class RunSpiderCommandTest(CommandTest):
 
     def test_runspider(self):
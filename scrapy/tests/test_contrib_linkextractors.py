@@ -3,6 +3,7 @@ import unittest
 from scrapy.http import HtmlResponse
 from scrapy.link import Link
 from scrapy.contrib.linkextractors.sgml import SgmlLinkExtractor, BaseSgmlLinkExtractor
+from scrapy.contrib.linkextractors.lxmlhtml import LxmlLinkExtractor, LxmlParserLinkExtractor
 from scrapy.tests import get_testdata
 
 
@@ -103,19 +104,22 @@ class LinkExtractorTestCase(unittest.TestCase):
 
 
 class SgmlLinkExtractorTestCase(unittest.TestCase):
+
+    extractor_cls = SgmlLinkExtractor
+
     def setUp(self):
         body = get_testdata('link_extractor', 'sgml_linkextractor.html')
         self.response = HtmlResponse(url='http://example.com/index', body=body)
 
     def test_urls_type(self):
         '''Test that the resulting urls are regular strings and not a unicode objects'''
-        lx = SgmlLinkExtractor()
+        lx = self.extractor_cls()
         self.assertTrue(all(isinstance(link.url, str) for link in lx.extract_links(self.response)))
 
     def test_extraction(self):
         '''Test the extractor's behaviour among different situations'''
 
-        lx = SgmlLinkExtractor()
+        lx = self.extractor_cls()
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://example.com/sample1.html', text=u''),
             Link(url='http://example.com/sample2.html', text=u'sample 2'),
@@ -123,14 +127,14 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
             Link(url='http://www.google.com/something', text=u''),
         ])
 
-        lx = SgmlLinkExtractor(allow=('sample', ))
+        lx = self.extractor_cls(allow=('sample', ))
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://example.com/sample1.html', text=u''),
             Link(url='http://example.com/sample2.html', text=u'sample 2'),
             Link(url='http://example.com/sample3.html', text=u'sample 3 text'),
         ])
 
-        lx = SgmlLinkExtractor(allow=('sample', ), unique=False)
+        lx = self.extractor_cls(allow=('sample', ), unique=False)
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://example.com/sample1.html', text=u''),
             Link(url='http://example.com/sample2.html', text=u'sample 2'),
@@ -138,20 +142,20 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
             Link(url='http://example.com/sample3.html', text=u'sample 3 repetition'),
         ])
 
-        lx = SgmlLinkExtractor(allow=('sample', ))
+        lx = self.extractor_cls(allow=('sample', ))
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://example.com/sample1.html', text=u''),
             Link(url='http://example.com/sample2.html', text=u'sample 2'),
             Link(url='http://example.com/sample3.html', text=u'sample 3 text'),
         ])
 
-        lx = SgmlLinkExtractor(allow=('sample', ), deny=('3', ))
+        lx = self.extractor_cls(allow=('sample', ), deny=('3', ))
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://example.com/sample1.html', text=u''),
             Link(url='http://example.com/sample2.html', text=u'sample 2'),
         ])
 
-        lx = SgmlLinkExtractor(allow_domains=('google.com', ))
+        lx = self.extractor_cls(allow_domains=('google.com', ))
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://www.google.com/something', text=u''),
         ])
@@ -159,25 +163,25 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
     def test_extraction_using_single_values(self):
         '''Test the extractor's behaviour among different situations'''
 
-        lx = SgmlLinkExtractor(allow='sample')
+        lx = self.extractor_cls(allow='sample')
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://example.com/sample1.html', text=u''),
             Link(url='http://example.com/sample2.html', text=u'sample 2'),
             Link(url='http://example.com/sample3.html', text=u'sample 3 text'),
         ])
 
-        lx = SgmlLinkExtractor(allow='sample', deny='3')
+        lx = self.extractor_cls(allow='sample', deny='3')
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://example.com/sample1.html', text=u''),
             Link(url='http://example.com/sample2.html', text=u'sample 2'),
         ])
 
-        lx = SgmlLinkExtractor(allow_domains='google.com')
+        lx = self.extractor_cls(allow_domains='google.com')
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://www.google.com/something', text=u''),
         ])
 
-        lx = SgmlLinkExtractor(deny_domains='example.com')
+        lx = self.extractor_cls(deny_domains='example.com')
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://www.google.com/something', text=u''),
         ])
@@ -186,23 +190,23 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
         url1 = 'http://lotsofstuff.com/stuff1/index'
         url2 = 'http://evenmorestuff.com/uglystuff/index'
 
-        lx = SgmlLinkExtractor(allow=(r'stuff1', ))
+        lx = self.extractor_cls(allow=(r'stuff1', ))
         self.assertEqual(lx.matches(url1), True)
         self.assertEqual(lx.matches(url2), False)
 
-        lx = SgmlLinkExtractor(deny=(r'uglystuff', ))
+        lx = self.extractor_cls(deny=(r'uglystuff', ))
         self.assertEqual(lx.matches(url1), True)
         self.assertEqual(lx.matches(url2), False)
 
-        lx = SgmlLinkExtractor(allow_domains=('evenmorestuff.com', ))
+        lx = self.extractor_cls(allow_domains=('evenmorestuff.com', ))
         self.assertEqual(lx.matches(url1), False)
         self.assertEqual(lx.matches(url2), True)
 
-        lx = SgmlLinkExtractor(deny_domains=('lotsofstuff.com', ))
+        lx = self.extractor_cls(deny_domains=('lotsofstuff.com', ))
         self.assertEqual(lx.matches(url1), False)
         self.assertEqual(lx.matches(url2), True)
 
-        lx = SgmlLinkExtractor(allow=('blah1',), deny=('blah2',),
+        lx = self.extractor_cls(allow=('blah1',), deny=('blah2',),
                                allow_domains=('blah1.com',),
                                deny_domains=('blah2.com',))
         self.assertEqual(lx.matches('http://blah1.com/blah1'), True)
@@ -211,7 +215,7 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
         self.assertEqual(lx.matches('http://blah2.com/blah2'), False)
 
     def test_restrict_xpaths(self):
-        lx = SgmlLinkExtractor(restrict_xpaths=('//div[@id="subwrapper"]', ))
+        lx = self.extractor_cls(restrict_xpaths=('//div[@id="subwrapper"]', ))
         self.assertEqual([link for link in lx.extract_links(self.response)], [
             Link(url='http://example.com/sample1.html', text=u''),
             Link(url='http://example.com/sample2.html', text=u'sample 2'),
@@ -230,7 +234,7 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
         </body></html>"""
         response = HtmlResponse("http://example.org/somepage/index.html", body=html, encoding='windows-1252')
 
-        lx = SgmlLinkExtractor(restrict_xpaths="//div[@class='links']")
+        lx = self.extractor_cls(restrict_xpaths="//div[@class='links']")
         self.assertEqual(lx.extract_links(response),
                          [Link(url='http://example.org/about.html', text=u'About us\xa3')])
 
@@ -238,7 +242,7 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
         """html entities cause SGMLParser to call handle_data hook twice"""
         body = """<html><body><div><a href="/foo">&gt;\xbe\xa9&lt;\xb6\xab</a></body></html>"""
         response = HtmlResponse("http://example.org", body=body, encoding='gb18030')
-        lx = SgmlLinkExtractor(restrict_xpaths="//div")
+        lx = self.extractor_cls(restrict_xpaths="//div")
         self.assertEqual(lx.extract_links(response),
                          [Link(url='http://example.org/foo', text=u'>\u4eac<\u4e1c',
                                fragment='', nofollow=False)])
@@ -246,7 +250,7 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
     def test_encoded_url(self):
         body = """<html><body><div><a href="?page=2">BinB</a></body></html>"""
         response = HtmlResponse("http://known.fm/AC%2FDC/", body=body, encoding='utf8')
-        lx = SgmlLinkExtractor()
+        lx = self.extractor_cls()
         self.assertEqual(lx.extract_links(response), [
             Link(url='http://known.fm/AC%2FDC/?page=2', text=u'BinB', fragment='', nofollow=False),
         ])
@@ -254,7 +258,7 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
     def test_encoded_url_in_restricted_xpath(self):
         body = """<html><body><div><a href="?page=2">BinB</a></body></html>"""
         response = HtmlResponse("http://known.fm/AC%2FDC/", body=body, encoding='utf8')
-        lx = SgmlLinkExtractor(restrict_xpaths="//div")
+        lx = self.extractor_cls(restrict_xpaths="//div")
         self.assertEqual(lx.extract_links(response), [
             Link(url='http://known.fm/AC%2FDC/?page=2', text=u'BinB', fragment='', nofollow=False),
         ])
@@ -262,7 +266,7 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
     def test_deny_extensions(self):
         html = """<a href="page.html">asd</a> and <a href="photo.jpg">"""
         response = HtmlResponse("http://example.org/", body=html)
-        lx = SgmlLinkExtractor()
+        lx = self.extractor_cls()
         self.assertEqual(lx.extract_links(response), [
             Link(url='http://example.org/page.html', text=u'asd'),
         ])
@@ -280,7 +284,7 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
             if m:
                 return m.group(1)
 
-        lx = SgmlLinkExtractor(process_value=process_value)
+        lx = self.extractor_cls(process_value=process_value)
         self.assertEqual(lx.extract_links(response),
                          [Link(url='http://example.org/other/page.html', text='Link text')])
 
@@ -289,10 +293,55 @@ class SgmlLinkExtractorTestCase(unittest.TestCase):
         <body><p><a href="item/12.html">Item 12</a></p>
         </body></html>"""
         response = HtmlResponse("http://example.org/somepage/index.html", body=html)
-        lx = SgmlLinkExtractor(restrict_xpaths="//p")
+        lx = self.extractor_cls(restrict_xpaths="//p")
         self.assertEqual(lx.extract_links(response),
                          [Link(url='http://otherdomain.com/base/item/12.html', text='Item 12')])
 
+    def test_shared_parsing(self):
+        html = """<a href="/item?b=2&a=1">Item</a> <a href="/about.html">About</a>"""
+        response = HtmlResponse("http://example.org/", body=html)
+        parsed = []
+
+        class CountingLinkExtractor(SgmlLinkExtractor):
+            def _parse_links(self, response):
+                parsed.append(response)
+                return SgmlLinkExtractor._parse_links(self, response)
+
+        lx1 = CountingLinkExtractor(allow='item')
+        lx2 = CountingLinkExtractor(canonicalize=False)
+        lx3 = CountingLinkExtractor(restrict_xpaths='//a[1]', canonicalize=False)
+        self.assertEqual(lx1.extract_links(response),
+                         [Link(url='http://example.org/item?a=1&b=2', text=u'Item')])
+        self.assertEqual(lx2.extract_links(response),
+                         [Link(url='http://example.org/item?b=2&a=1', text=u'Item'),
+                          Link(url='http://example.org/about.html', text=u'About')])
+        self.assertEqual(lx3.extract_links(response),
+                         [Link(url='http://example.org/item?b=2&a=1', text=u'Item')])
+        self.assertEqual(lx1.extract_links(response), lx1.extract_links(response))
+        # the response is parsed once per restrict_xpaths
+        self.assertEqual(len(parsed), 2)
+
+
+class LxmlLinkExtractorTestCase(SgmlLinkExtractorTestCase):
+
+    extractor_cls = LxmlLinkExtractor
+
+    def test_nested_link_text(self):
+        html = """<a href="/item.html">Item <b>12</b></a>"""
+        response = HtmlResponse("http://example.org/", body=html)
+        lx = LxmlLinkExtractor()
+        self.assertEqual(lx.extract_links(response),
+                         [Link(url='http://example.org/item.html', text=u'Item 12')])
+
+    def test_parser_link_extractor(self):
+        html = """<a href="/item.html">Item</a> <a href="/item.html">Item</a>"""
+        response = HtmlResponse("http://example.org/", body=html)
+        lx = LxmlParserLinkExtractor(unique=True)
+        # links are not accumulated across calls
+        for _ in range(2):
+            self.assertEqual(lx.extract_links(response),
+                             [Link(url='http://example.org/item.html', text=u'Item')])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -318,6 +318,60 @@ class ItemLoaderTest(unittest.TestCase):
         il.replace_value('url', u'text2')
         self.assertEqual(il.get_output_value('url'), ['marta'])
 
+    def test_processors_looked_up_once(self):
+        lookups = []
+
+        class ChildItemLoader(TestItemLoader):
+            def get_input_processor(self, field_name):
+                lookups.append(field_name)
+                return super(ChildItemLoader, self).get_input_processor(field_name)
+
+        il = ChildItemLoader()
+        for name in (u'marta', u'pepe'):
+            il.add_value('name', name)
+            il.add_value('url', u'text')
+        self.assertEqual(il.get_output_value('name'), [u'Marta', u'Pepe'])
+        self.assertEqual(lookups, ['name', 'url'])
+
+        # and again by other loaders
+        il = ChildItemLoader()
+        il.add_value('name', u'marta')
+        self.assertEqual(lookups, ['name', 'url', 'name'])
+
+    def test_processors_per_loader(self):
+        class ChildItemLoader(TestItemLoader):
+            def __init__(self, prefix, **kwargs):
+                super(ChildItemLoader, self).__init__(**kwargs)
+                self.prefix = prefix
+
+            def name_in(self, values):
+                return [self.prefix + v for v in values]
+
+        for prefix in (u'a-', u'b-'):
+            il = ChildItemLoader(prefix)
+            il.add_value('name', u'x')
+            self.assertEqual(il.get_output_value('name'), [prefix + u'x'])
+
+        il = NameItemLoader()
+        il.name_out = TakeFirst()
+        il.add_value('name', [u'p', u'q'])
+        self.assertEqual(il.load_item()['name'], u'p')
+        il = NameItemLoader()
+        il.add_value('name', [u'p', u'q'])
+        self.assertEqual(il.load_item()['name'], [u'p', u'q'])
+
+    def test_output_processor_with_context(self):
+        class JoinWithContext(object):
+            def __call__(self, values, loader_context):
+                return loader_context['sep'].join(values)
+
+        class ChildItemLoader(TestItemLoader):
+            name_out = JoinWithContext()
+
+        il = ChildItemLoader(sep=u'-')
+        il.add_value('name', [u'mar', u'ta'])
+        self.assertEqual(il.get_output_value('name'), u'Mar-Ta')
+
     def test_add_value_on_unknown_field(self):
         il = TestItemLoader()
         self.assertRaises(KeyError, il.add_value, 'wrong_field', [u'lala', u'lolo'])
@@ -27,6 +27,17 @@ class CrawlTestCase(TestCase):
         yield docrawl(spider)
         self.assertEqual(len(spider.urls_visited), 11)  # 10 + start_url
 
+    @defer.inlineCallbacks
+    def test_callback_time_stats(self):
+        spider = FollowAllSpider()
+        crawler = get_crawler()
+        crawler.configure()
+        crawler.crawl(spider)
+        yield crawler.start()
+        stats = crawler.stats.spider_stats[spider.name]
+        self.assertTrue(stats['scraper/callback_time/parse'] > 0)
+        self.assertTrue(stats['scraper/callback_time_max/parse'] > 0)
+
     @defer.inlineCallbacks
     def test_delay(self):
         # short to long delays
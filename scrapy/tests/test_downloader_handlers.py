@@ -1,4 +1,5 @@
 import os
+import socket
 import twisted
 
 from twisted.trial import unittest
@@ -25,6 +26,8 @@ from scrapy.core.downloader.handlers.ftp import FTPDownloadHandler
 from scrapy.spider import BaseSpider
 from scrapy.http import Request
 from scrapy.settings import Settings
+from scrapy.utils.request import request_httprepr
+from scrapy.utils.response import response_httprepr
 from scrapy import optional_features
 
 
@@ -155,6 +158,36 @@ class HttpTestCase(unittest.TestCase):
         d.addCallback(self.assertEquals, body)
         return d
 
+    def test_transferred_bytes(self):
+        def _test(response):
+            # Host header includes the port number
+            self.assertEquals(request.meta['download_bytes_sent'],
+                len(request_httprepr(request)) + len(':%d' % self.portno))
+            self.assertEquals(request.meta['download_bytes_received'],
+                len(response_httprepr(response)))
+
+        request = Request(self.getURL('file'), headers={'X-Test': 'value'})
+        return self.download_request(request, BaseSpider('foo')).addCallback(_test)
+
+    @defer.inlineCallbacks
+    def test_transferred_bytes_failures(self):
+        spider = BaseSpider('foo')
+        # requests to unreachable hosts are never sent
+        s = socket.socket()
+        s.bind(('127.0.0.1', 0))
+        portno = s.getsockname()[1]
+        s.close()
+        request = Request('http://127.0.0.1:%d/file' % portno)
+        d = self.download_request(request, spider)
+        yield self.assertFailure(d, error.ConnectError)
+        self.assertNotIn('download_bytes_sent', request.meta)
+        # requests sent before failing are
+        request = Request(self.getURL('wait'), meta={'download_timeout': 0.2})
+        d = self.download_request(request, spider)
+        yield self.assertFailure(d, defer.TimeoutError, error.TimeoutError)
+        self.assertEquals(request.meta['download_bytes_sent'],
+            len(request_httprepr(request)) + len(':%d' % self.portno))
+
 
 class DeprecatedHttpTestCase(HttpTestCase):
     """HTTP 1.0 test case"""
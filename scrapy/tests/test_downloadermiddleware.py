@@ -1,4 +1,5 @@
 from twisted.trial.unittest import TestCase
+from twisted.internet import defer
 from twisted.python.failure import Failure
 
 from scrapy.http import Request, Response
@@ -91,3 +92,51 @@ class DefaultsTest(ManagerTestCase):
             'Location': 'http://example.com/login',
         })
         self.assertRaises(IOError, self._download, request=req, response=resp)
+
+
+class DeferredMiddlewareTest(TestCase):
+    """Middleware methods returning Deferreds are chained, the rest are
+    called synchronously"""
+
+    def _get_manager(self, *middlewares):
+        return DownloaderMiddlewareManager(*middlewares)
+
+    def test_deferred_results(self):
+        calls = []
+        class SyncMiddleware(object):
+            def process_request(self, request, spider):
+                calls.append('sync request')
+            def process_response(self, request, response, spider):
+                calls.append('sync response')
+                return response
+        class DeferredMiddleware(object):
+            def process_request(self, request, spider):
+                calls.append('deferred request')
+                return defer.succeed(None)
+            def process_response(self, request, response, spider):
+                calls.append('deferred response')
+                return defer.succeed(response)
+        mwman = self._get_manager(DeferredMiddleware(), SyncMiddleware())
+        request = Request('http://example.com')
+        response = Response(request.url)
+        def download_func(**kwargs):
+            calls.append('download')
+            return response
+        results = []
+        mwman.download(download_func, request, None).addBoth(results.append)
+        self.assertEqual(results, [response])
+        self.assertEqual(calls, ['deferred request', 'sync request',
+            'download', 'sync response', 'deferred response'])
+
+    def test_deferred_response_shortcut(self):
+        request = Request('http://example.com')
+        response = Response(request.url)
+        class CacheMiddleware(object):
+            def process_request(self, request, spider):
+                return defer.succeed(response)
+        def download_func(**kwargs):
+            raise AssertionError('download_func must not be called')
+        mwman = self._get_manager(CacheMiddleware())
+        results = []
+        mwman.download(download_func, request, None).addBoth(results.append)
+        self.assertEqual(results, [response])
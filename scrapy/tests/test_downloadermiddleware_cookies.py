@@ -134,3 +134,35 @@ class CookiesMiddlewareTest(TestCase):
         req6 = Request('file:///scrapy/sometempfile')
         assert self.mw.process_request(req6, self.spider) is None
         self.assertEquals(req6.headers.get('Cookie'), None)
+
+    def test_request_cookies_values(self):
+        req = Request('http://scrapytest.org/', cookies={u'caf\xe9': u'cr\xe8me',
+            'count': 3, 'list': 'a;b'})
+        assert self.mw.process_request(req, self.spider) is None
+        self.assertEquals(sorted(req.headers.get('Cookie').split('; ')),
+            ['caf\xc3\xa9=cr\xc3\xa8me', 'count=3', 'list=a;b'])
+
+    def test_dotless_host(self):
+        req = Request('http://localhost/')
+        res = Response('http://localhost/', headers={'Set-Cookie': 'C1=value1'})
+        self.mw.process_response(req, res, self.spider)
+
+        req2 = Request('http://localhost/sub1/')
+        assert self.mw.process_request(req2, self.spider) is None
+        self.assertEquals(req2.headers.get('Cookie'), 'C1=value1')
+
+    def test_idle_jars_evicted(self):
+        self.mw = CookiesMiddleware(idle_timeout=60)
+        headers = {'Set-Cookie': 'C1=value1; path=/'}
+        for key in (None, 'store1', 'store2'):
+            req = Request('http://scrapytest.org/', meta={'cookiejar': key})
+            res = Response('http://scrapytest.org/', headers=headers)
+            self.mw.process_response(req, res, self.spider)
+        self.mw.last_used['store1'] -= 120
+        self.mw.last_eviction -= 120
+
+        for key, cookie in [('store2', 'C1=value1'), ('store1', None),
+                            (None, 'C1=value1')]:
+            req = Request('http://scrapytest.org/', meta={'cookiejar': key})
+            self.mw.process_request(req, self.spider)
+            self.assertEquals(req.headers.get('Cookie'), cookie)
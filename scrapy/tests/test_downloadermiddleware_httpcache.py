@@ -1,16 +1,23 @@
+import os
 import time
+import sqlite3
 import tempfile
 import shutil
 import unittest
 import email.utils
 from contextlib import contextmanager
 
+from twisted import trial
+from twisted.internet import defer
+
 from scrapy.http import Response, HtmlResponse, Request
 from scrapy.spider import BaseSpider
 from scrapy.settings import Settings
 from scrapy.exceptions import IgnoreRequest
 from scrapy.utils.test import get_crawler
 from scrapy.contrib.downloadermiddleware.httpcache import HttpCacheMiddleware
+from scrapy.core.downloader import Downloader
+from scrapy.contrib.httpcache import CacheCompressor, ThreadedCacheStorage
 
 
 class _BaseTest(unittest.TestCase):
@@ -110,6 +117,25 @@ class DefaultStorageTest(_BaseTest):
             time.sleep(0.5)  # give the chance to expire
             assert storage.retrieve_response(self.spider, self.request)
 
+    def test_storage_prune(self):
+        with self._storage() as storage:
+            storage.store_response(self.spider, self.request, self.response)
+            self.assertEqual(storage.prune(), 0)
+            time.sleep(2)  # wait for cache to expire
+            self.assertEqual(storage.prune(), 1)
+            assert storage.retrieve_response(self.spider, self.request) is None
+
+    def _store_sized_responses(self, storage, count, lookup=None):
+        requests = [Request('http://www.example.com/%d' % i) for i in range(count)]
+        for i, request in enumerate(requests):
+            storage.store_response(self.spider, request,
+                self.response.replace(body=os.urandom(1000)))
+            if lookup is not None:
+                storage.retrieve_response(self.spider, requests[lookup])
+            time.sleep(0.01)
+        return [storage.retrieve_response(self.spider, r) is not None
+                for r in requests]
+
 
 class DbmStorageTest(DefaultStorageTest):
 
@@ -135,6 +161,358 @@ class FilesystemStorageTest(DefaultStorageTest):
     storage_class = 'scrapy.contrib.httpcache.FilesystemCacheStorage'
 
 
+class SegmentStorageTest(DefaultStorageTest):
+
+    storage_class = 'scrapy.contrib.httpcache.SegmentCacheStorage'
+
+    def test_storage_segments(self):
+        with self._storage(HTTPCACHE_SEGMENT_SIZE=1) as storage:
+            requests = [Request('http://www.example.com/%d' % i) for i in range(3)]
+            for request in requests:
+                storage.store_response(self.spider, request, self.response)
+            self.assertEqual(len(storage._segments()), 3)
+            for request in requests:
+                response = storage.retrieve_response(self.spider, request)
+                self.assertEqualResponse(self.response, response)
+
+    def test_storage_compact(self):
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            request2 = Request('http://www.example.com/other')
+            response2 = self.response.replace(body='other body')
+            storage.store_response(self.spider, self.request, self.response)
+            storage.store_response(self.spider, self.request, self.response)
+            storage.store_response(self.spider, request2, response2)
+            size, garbage = storage._segments_size(), storage.garbage
+            assert 0 < garbage < size
+            storage.compact()
+            self.assertEqual(storage.garbage, 0)
+            self.assertEqual(storage._segments_size(), size - garbage)
+            self.assertEqualResponse(self.response,
+                storage.retrieve_response(self.spider, self.request))
+            self.assertEqualResponse(response2,
+                storage.retrieve_response(self.spider, request2))
+
+        # compacted entries are found after reopening the storage
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            self.assertEqualResponse(response2,
+                storage.retrieve_response(self.spider, request2))
+
+    def test_storage_max_size(self):
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0,
+                HTTPCACHE_MAX_SIZE=2800) as storage:
+            self.assertEqual(self._store_sized_responses(storage, 3),
+                [False, True, True])
+            assert storage.size <= 2800
+            # the evicted response is only dropped from the index
+            assert storage._segments_size() > 2800
+            storage.compact()
+            assert storage._segments_size() <= 2800
+
+    def test_storage_compact_expired(self):
+        with self._storage() as storage:
+            storage.store_response(self.spider, self.request, self.response)
+            time.sleep(2)  # wait for cache to expire
+            storage.compact()
+            self.assertEqual(storage._segments_size(), 0)
+            assert storage.retrieve_response(self.spider, self.request) is None
+
+
+class SqliteStorageTest(DefaultStorageTest):
+
+    storage_class = 'scrapy.contrib.httpcache.SqliteCacheStorage'
+
+    def _count_rows(self, storage):
+        conn = sqlite3.connect(os.path.join(self.tmpdir, '%s.sqlite' % self.spider.name))
+        try:
+            return conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_storage_batched_commits(self):
+        with self._storage(HTTPCACHE_SQLITE_COMMIT_INTERVAL=60) as storage:
+            storage.store_response(self.spider, self.request, self.response)
+            self.assertEqual(self._count_rows(storage), 0)
+            storage.commit()
+            self.assertEqual(self._count_rows(storage), 1)
+        with self._storage(HTTPCACHE_SQLITE_COMMIT_INTERVAL=0) as storage:
+            storage.store_response(self.spider, Request('http://www.example.com/2'),
+                self.response)
+            self.assertEqual(self._count_rows(storage), 2)
+
+    def test_storage_prune(self):
+        with self._storage() as storage:
+            storage.store_response(self.spider, self.request, self.response)
+            self.assertEqual(storage.prune(), 0)
+            time.sleep(2)  # wait for cache to expire
+            self.assertEqual(storage.prune(), 1)
+            self.assertEqual(self._count_rows(storage), 0)
+
+    def test_storage_max_size_lru(self):
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0,
+                HTTPCACHE_MAX_SIZE=2500) as storage:
+            self.assertEqual(self._store_sized_responses(storage, 3, lookup=0),
+                [True, False, True])
+            assert storage.size <= 2500
+
+    def test_storage_max_size_age(self):
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0, HTTPCACHE_MAX_SIZE=2500,
+                HTTPCACHE_EVICTION_POLICY='age') as storage:
+            self.assertEqual(self._store_sized_responses(storage, 3, lookup=0),
+                [False, True, True])
+
+    def test_storage_prune_max_size(self):
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            self._store_sized_responses(storage, 3)
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0,
+                HTTPCACHE_MAX_SIZE=2500) as storage:
+            self.assertEqual(storage.prune(), 1)
+            storage.compact()
+            self.assertEqual(self._count_rows(storage), 2)
+
+
+class _CompressionStorageTest(object):
+
+    def _get_settings(self, **new_settings):
+        new_settings.setdefault('HTTPCACHE_COMPRESSION', True)
+        return super(_CompressionStorageTest, self)._get_settings(**new_settings)
+
+    def test_storage_compression_stats(self):
+        with self._middleware(HTTPCACHE_EXPIRATION_SECS=0) as mw:
+            mw.storage.store_response(self.spider, self.request, self.response)
+            self.assertEqualResponse(self.response,
+                mw.storage.retrieve_response(self.spider, self.request))
+        stats = self.crawler.stats
+        assert stats.get_value('httpcache/compression/raw_bytes', spider=self.spider) > 0
+        assert stats.get_value('httpcache/compression/compressed_bytes', spider=self.spider) > 0
+        assert stats.get_value('httpcache/compression/ratio', spider=self.spider) > 0
+
+    def test_storage_read_uncompressed(self):
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0,
+                HTTPCACHE_COMPRESSION=False) as storage:
+            storage.store_response(self.spider, self.request, self.response)
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            self.assertEqualResponse(self.response,
+                storage.retrieve_response(self.spider, self.request))
+
+    def test_storage_missing_dictionary(self):
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            storage.compressor._prime(self.response.body)
+            storage.store_response(self.spider, self.request, self.response)
+            # responses compressed with a lost dictionary are cache misses
+            storage.compressor._primed = None
+            assert storage.retrieve_response(self.spider, self.request) is None
+
+    def _store_pages(self, storage, title):
+        template = ''.join('<div class="%s-%d">%s item %d</div>\n' % (title, i, title, i)
+            for i in range(50))
+        requests = [Request('http://www.example.com/%s/%d' % (title, i))
+            for i in range(CacheCompressor.train_samples + 1)]
+        for i, request in enumerate(requests):
+            body = '<html>\n<title>%s</title>\n%s<p>Page %d</p>\n</html>' % \
+                (title, template, i)
+            storage.store_response(self.spider, request,
+                self.response.replace(body=body))
+        return requests
+
+    def test_storage_retrained_dictionary(self):
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            requests = self._store_pages(storage, 'Shop')
+            assert storage.retrieve_response(self.spider, requests[-1]) is not None
+            dictpath = storage.compressor.dictpath
+        # the dictionary is lost and another one is trained
+        os.remove(dictpath)
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            self._store_pages(storage, 'News')
+            assert os.path.exists(dictpath)
+            # responses compressed with the first dictionary are cache misses
+            assert storage.retrieve_response(self.spider, requests[-1]) is None
+            response = storage.retrieve_response(self.spider, requests[0])
+            assert '<title>Shop</title>' in response.body
+
+
+class DbmStorageWithCompressionTest(_CompressionStorageTest, DbmStorageTest):
+    pass
+
+
+class FilesystemStorageWithCompressionTest(_CompressionStorageTest, FilesystemStorageTest):
+    pass
+
+
+class SegmentStorageWithCompressionTest(_CompressionStorageTest, SegmentStorageTest):
+    pass
+
+
+class CacheCompressorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.dictpath = os.path.join(self.tmpdir, 'spider', 'zdict')
+        template = ''.join('<div class="menu-%d">Menu item %d</div>\n' % (i, i)
+            for i in range(50))
+        self.pages = ['<html>\n%s<p>Page %d</p>\n</html>' % (template, i)
+            for i in range(CacheCompressor.train_samples + 5)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_compress(self):
+        compressor = CacheCompressor()
+        for page in self.pages:
+            compressed = compressor.compress(page)
+            assert CacheCompressor.is_compressed(compressed)
+            self.assertEqual(compressor.decompress(compressed), page)
+        assert not os.path.exists(self.dictpath)
+        self.assertEqual(compressor.stats['raw_bytes'], sum(map(len, self.pages)))
+        assert compressor.get_ratio() > 1
+
+    def test_compress_with_dictionary(self):
+        compressor = CacheCompressor(self.dictpath)
+        compressed = map(compressor.compress, self.pages)
+        assert os.path.exists(self.dictpath)
+        # pages compressed after training are much smaller
+        assert len(compressed[-1]) * 3 < len(compressed[0])
+        for page, data in zip(self.pages, compressed):
+            self.assertEqual(compressor.decompress(data), page)
+
+        # the dictionary is reused by later compressors
+        compressor2 = CacheCompressor(self.dictpath)
+        for page, data in zip(self.pages, compressed):
+            self.assertEqual(compressor2.decompress(data), page)
+        self.assertEqual(compressor2.compress(self.pages[-1]), compressed[-1])
+
+    def test_decompress_missing_dictionary(self):
+        compressor = CacheCompressor(self.dictpath)
+        compressed = map(compressor.compress, self.pages)
+        os.remove(self.dictpath)
+        compressor2 = CacheCompressor(self.dictpath)
+        self.assertEqual(compressor2.decompress(compressed[0]), self.pages[0])
+        assert compressor2.decompress(compressed[-1]) is None
+
+    def test_compress_without_training(self):
+        compressor = CacheCompressor(self.dictpath, train=False)
+        map(compressor.compress, self.pages)
+        assert not os.path.exists(self.dictpath)
+
+
+class SqliteStorageWithCompressionTest(_CompressionStorageTest, SqliteStorageTest):
+    pass
+
+
+class ThreadedStorageTest(trial.unittest.TestCase):
+
+    def setUp(self):
+        self.crawler = get_crawler()
+        self.spider = BaseSpider('example.com')
+        self.tmpdir = tempfile.mkdtemp()
+        self.request = Request('http://www.example.com')
+        self.response = Response('http://www.example.com',
+                                 headers={'Content-Type': 'text/html'},
+                                 body='test body')
+        self.crawler.stats.open_spider(self.spider)
+
+    def tearDown(self):
+        self.crawler.stats.close_spider(self.spider, '')
+        shutil.rmtree(self.tmpdir)
+
+    def _get_middleware(self, storage_class):
+        settings = Settings({
+            'HTTPCACHE_ENABLED': True,
+            'HTTPCACHE_ASYNC': True,
+            'HTTPCACHE_DIR': self.tmpdir,
+            'HTTPCACHE_STORAGE': storage_class,
+        })
+        mw = HttpCacheMiddleware(settings, self.crawler.stats)
+        mw.spider_opened(self.spider)
+        return mw
+
+    @defer.inlineCallbacks
+    def _test_storage(self, storage_class):
+        mw = self._get_middleware(storage_class)
+        assert isinstance(mw.storage, ThreadedCacheStorage)
+        response = yield mw.storage.retrieve_response(self.spider, self.request)
+        assert response is None
+        yield mw.storage.store_response(self.spider, self.request, self.response)
+        response = yield mw.storage.retrieve_response(self.spider, self.request)
+        self.assertEqual(response.body, self.response.body)
+        yield mw.spider_closed(self.spider)
+
+        # read from storage, not from memory
+        mw = self._get_middleware(storage_class)
+        assert not mw.storage.entries
+        response = yield mw.process_request(self.request, self.spider)
+        self.assertEqual(response.body, self.response.body)
+        assert 'cached' in response.flags
+        yield mw.spider_closed(self.spider)
+
+    def test_dbm_storage(self):
+        return self._test_storage('scrapy.contrib.httpcache.DbmCacheStorage')
+
+    def test_filesystem_storage(self):
+        return self._test_storage('scrapy.contrib.httpcache.FilesystemCacheStorage')
+
+    def test_storage_calls_serialized(self):
+        # none of the built-in storages can be called from several threads
+        # at once, ie. the filesystem storage rewrites files in place
+        for storage_class in ('DbmCacheStorage', 'FilesystemCacheStorage',
+                'SegmentCacheStorage', 'SqliteCacheStorage'):
+            mw = self._get_middleware('scrapy.contrib.httpcache.%s' % storage_class)
+            assert mw.storage._lock is not None
+            mw.spider_closed(self.spider)
+
+    def test_segment_storage(self):
+        return self._test_storage('scrapy.contrib.httpcache.SegmentCacheStorage')
+
+    def test_sqlite_storage(self):
+        return self._test_storage('scrapy.contrib.httpcache.SqliteCacheStorage')
+
+    @defer.inlineCallbacks
+    def test_middleware(self):
+        mw = self._get_middleware('scrapy.contrib.httpcache.DbmCacheStorage')
+        response = yield mw.process_request(self.request, self.spider)
+        assert response is None
+        mw.process_response(self.request, self.response, self.spider)
+        yield defer.DeferredList(list(mw.storage._writes))
+        # served from memory once stored
+        assert mw.storage.entries
+        response = yield mw.process_request(self.request, self.spider)
+        self.assertEqual(response.body, self.response.body)
+        assert 'cached' in response.flags
+        assert 'cached' not in self.response.flags
+        yield mw.spider_closed(self.spider)
+
+    @defer.inlineCallbacks
+    def test_failed_write_not_kept(self):
+        mw = self._get_middleware('scrapy.contrib.httpcache.DbmCacheStorage')
+        def store_response(spider, request, response):
+            raise IOError('disk full')
+        mw.storage.storage.store_response = store_response
+        yield mw.storage.store_response(self.spider, self.request, self.response)
+        assert not mw.storage.entries
+        self.flushLoggedErrors(IOError)
+        yield mw.spider_closed(self.spider)
+
+    @defer.inlineCallbacks
+    def test_memory_hits_recorded(self):
+        mw = self._get_middleware('scrapy.contrib.httpcache.SqliteCacheStorage')
+        touched = []
+        mw.storage.storage.touch_response = lambda spider, request: \
+            touched.append(request)
+        yield mw.storage.store_response(self.spider, self.request, self.response)
+        response = yield mw.storage.retrieve_response(self.spider, self.request)
+        self.assertEqual(response.body, self.response.body)
+        yield defer.DeferredList(list(mw.storage._writes))
+        self.assertEqual(touched, [self.request])
+        yield mw.spider_closed(self.spider)
+
+    @defer.inlineCallbacks
+    def test_threadpool_stopped(self):
+        mw = self._get_middleware('scrapy.contrib.httpcache.DbmCacheStorage')
+        assert mw.storage._shutdown_trigger is not None
+        yield mw.spider_closed(self.spider)
+        assert mw.storage._shutdown_trigger is None
+        assert mw.storage.threadpool.joined
+
+
 class DummyPolicyTest(_BaseTest):
 
     policy_class = 'scrapy.contrib.httpcache.DummyPolicy'
@@ -394,6 +772,58 @@ class RFC2616PolicyTest(DefaultStorageTest):
                     self.assertEqualResponse(res3, res0b)
                     assert 'cached' in res3.flags
 
+    def test_cached_and_stale_replay(self):
+        res0 = Response(self.request.url, status=200,
+                        headers={'Date': self.today, 'Expires': self.yesterday})
+        with self._middleware(HTTPCACHE_REPLAY=True,
+                HTTPCACHE_IGNORE_MISSING=True) as mw:
+            mw._cache_response(self.spider, res0, self.request, None)
+            # stale responses are served without revalidation
+            res1 = mw.process_request(self.request, self.spider)
+            self.assertEqualResponse(res1, res0)
+            assert 'cached' in res1.flags
+            self.assertEqual(mw.stats.get_value('httpcache/hit', spider=self.spider), 1)
+            # missing responses are still ignored
+            self.assertRaises(IgnoreRequest, mw.process_request,
+                Request('http://www.example.com/missing'), self.spider)
+
+
+class ReplayTest(trial.unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.crawler = get_crawler({
+            'HTTPCACHE_ENABLED': True,
+            'HTTPCACHE_REPLAY': True,
+            'HTTPCACHE_DIR': self.tmpdir,
+            'HTTPCACHE_POLICY': 'scrapy.contrib.httpcache.RFC2616Policy',
+            'DOWNLOAD_DELAY': 60,
+        })
+        self.spider = BaseSpider('example.com')
+        self.crawler.stats.open_spider(self.spider)
+        self.downloader = Downloader(self.crawler)
+        self.mw = [mw for mw in self.downloader.middleware.middlewares
+                   if isinstance(mw, HttpCacheMiddleware)][0]
+        self.mw.spider_opened(self.spider)
+
+    def tearDown(self):
+        self.mw.spider_closed(self.spider)
+        self.downloader.close()
+        self.crawler.stats.close_spider(self.spider, '')
+        shutil.rmtree(self.tmpdir)
+
+    @defer.inlineCallbacks
+    def test_cache_hits_skip_download_slots(self):
+        requests = [Request('http://www.example.com/%d' % i) for i in range(3)]
+        for request in requests:
+            response = Response(request.url, body='test body',
+                headers={'Expires': email.utils.formatdate(time.time() - 86400)})
+            self.mw.storage.store_response(self.spider, request, response)
+        for request in requests:
+            response = yield self.downloader.fetch(request, self.spider)
+            assert 'cached' in response.flags
+        self.assertEqual(self.downloader.slots, {})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -7,6 +7,7 @@ from scrapy.spider import BaseSpider
 from scrapy.http import Response, Request, HtmlResponse
 from scrapy.contrib.downloadermiddleware.httpcompression import HttpCompressionMiddleware
 from scrapy.tests import tests_datadir
+from scrapy.utils.test import get_crawler
 from w3lib.encoding import resolve_encoding
 
 
@@ -52,6 +53,17 @@ class HttpCompressionTest(TestCase):
         self.mw.process_request(request, self.spider)
         self.assertEqual(request.headers.get('Accept-Encoding'), 'x-gzip,gzip,deflate')
 
+    def test_process_response_stats(self):
+        crawler = get_crawler()
+        crawler.stats.open_spider(self.spider)
+        mw = HttpCompressionMiddleware(crawler.stats)
+        response = self._getresponse('gzip')
+        newresponse = mw.process_response(response.request, response, self.spider)
+        self.assertEqual(crawler.stats.get_value('httpcompression/response_count',
+            spider=self.spider), 1)
+        self.assertEqual(crawler.stats.get_value('httpcompression/response_bytes',
+            spider=self.spider), len(newresponse.body))
+
     def test_process_response_gzip(self):
         response = self._getresponse('gzip')
         request = response.request
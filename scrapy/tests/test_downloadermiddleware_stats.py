@@ -1,8 +1,11 @@
 from unittest import TestCase
 
 from scrapy.contrib.downloadermiddleware.stats import DownloaderStats
+from scrapy.exceptions import IgnoreRequest
 from scrapy.http import Request, Response
 from scrapy.spider import BaseSpider
+from scrapy.utils.request import request_httprepr
+from scrapy.utils.response import response_httprepr
 from scrapy.utils.test import get_crawler
 
 
@@ -28,11 +31,61 @@ class TestDownloaderStats(TestCase):
         self.assertEqual(self.crawler.stats.get_value('downloader/response_count', \
             spider=self.spider), 1)
 
+    def test_process_response_bytes(self):
+        self.req.meta['download_bytes_sent'] = 50
+        self.req.meta['download_bytes_received'] = 300
+        self.mw.process_response(self.req, self.res, self.spider)
+        self.assertEqual(self.crawler.stats.get_value('downloader/request_bytes', \
+            spider=self.spider), 50)
+        self.assertEqual(self.crawler.stats.get_value('downloader/response_bytes', \
+            spider=self.spider), 300)
+
+    def test_process_response_bytes_fallback(self):
+        req = Request('http://scrapytest.org/some/page.html?arg=1', method='POST',
+            headers={'Content-Type': 'text/html'}, body='Some body')
+        res = Response('http://scrapytest.org/some/page.html?arg=1', status=404,
+            headers={'Content-Type': 'text/html'}, body='Some body')
+        self.mw.process_response(req, res, self.spider)
+        self.assertEqual(self.crawler.stats.get_value('downloader/request_bytes', \
+            spider=self.spider), len(request_httprepr(req)))
+        self.assertEqual(self.crawler.stats.get_value('downloader/response_bytes', \
+            spider=self.spider), len(response_httprepr(res)))
+
+    def test_process_request_discards_previous_bytes(self):
+        self.req.meta['download_bytes_sent'] = 50
+        self.req.meta['download_bytes_received'] = 300
+        self.mw.process_request(self.req, self.spider)
+        self.assertNotIn('download_bytes_sent', self.req.meta)
+        self.assertNotIn('download_bytes_received', self.req.meta)
+
+    def test_per_slot_bytes(self):
+        mw = DownloaderStats(self.crawler.stats, per_slot=True)
+        self.req.meta.update(download_slot='scrapytest.org',
+            download_bytes_sent=50, download_bytes_received=300)
+        mw.process_response(self.req, self.res, self.spider)
+        self.assertEqual(self.crawler.stats.get_value( \
+            'downloader/slot/scrapytest.org/request_bytes', spider=self.spider), 50)
+        self.assertEqual(self.crawler.stats.get_value( \
+            'downloader/slot/scrapytest.org/response_bytes', spider=self.spider), 300)
+
     def test_process_exception(self):
         self.mw.process_exception(self.req, Exception(), self.spider)
         self.assertEqual(self.crawler.stats.get_value('downloader/exception_count', \
             spider=self.spider), 1)
 
+    def test_process_exception_bytes(self):
+        # requests failing before being sent (ie. ignored by another
+        # middleware) aren't counted
+        self.mw.process_request(self.req, self.spider)
+        self.mw.process_exception(self.req, IgnoreRequest(), self.spider)
+        self.assertEqual(self.crawler.stats.get_value('downloader/request_bytes', \
+            spider=self.spider), None)
+        # requests failing after being sent by the download handler are
+        self.req.meta['download_bytes_sent'] = 50
+        self.mw.process_exception(self.req, Exception(), self.spider)
+        self.assertEqual(self.crawler.stats.get_value('downloader/request_bytes', \
+            spider=self.spider), 50)
+
     def tearDown(self):
         self.crawler.stats.close_spider(self.spider, '')
 
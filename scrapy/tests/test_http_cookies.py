@@ -1,8 +1,9 @@
+import time
 from urlparse import urlparse
 from unittest import TestCase
 
 from scrapy.http import Request, Response
-from scrapy.http.cookies import WrappedRequest, WrappedResponse
+from scrapy.http.cookies import CookieJar, WrappedRequest, WrappedResponse
 
 
 class WrappedRequestTest(TestCase):
@@ -58,3 +59,46 @@ class WrappedResponseTest(TestCase):
 
     def test_getheaders(self):
         self.assertEqual(self.wrapped.getheaders('content-type'), ['text/html'])
+
+
+class CookieJarTest(TestCase):
+
+    def test_expired_cookies_removed(self):
+        jar = CookieJar()
+        request = Request("http://www.example.com/page.html")
+        expires = time.strftime('%a, %d-%b-%Y %H:%M:%S GMT',
+            time.gmtime(time.time() + 3600))
+        response = Response("http://www.example.com/page.html", headers={
+            'Set-Cookie': ['C1=value1; expires=%s' % expires, 'C2=value2']})
+        jar.extract_cookies(response, request)
+        self.assertEqual(len(jar), 2)
+
+        # make C1 expire, it's removed on the next request
+        [cookie] = [c for c in jar if c.name == 'C1']
+        cookie.expires = time.time() - 1
+        jar.jar._expiry = [(cookie.expires, cookie.domain, cookie.path, cookie.name)]
+        jar.add_cookie_header(Request("http://www.example.com/"))
+        self.assertEqual([c.name for c in jar], ['C2'])
+
+    def test_expiry_heap_bounded(self):
+        jar = CookieJar()
+        request = Request("http://www.example.com/page.html")
+        expires = time.strftime('%a, %d-%b-%Y %H:%M:%S GMT',
+            time.gmtime(time.time() + 3600))
+        response = Response("http://www.example.com/page.html", headers={
+            'Set-Cookie': 'C1=value1; expires=%s' % expires})
+        for _ in xrange(3000):
+            jar.extract_cookies(response, request)
+        self.assertEqual(len(jar), 1)
+        assert len(jar.jar._expiry) <= 1024
+
+    def test_make_cookies_from_dicts(self):
+        jar = CookieJar()
+        request = Request("http://www.example.com/page.html")
+        cookies = jar.make_cookies_from_dicts([
+            {'name': 'C1', 'value': 'value1'},
+            {'name': 'C2', 'value': 'value2', 'path': '/foo', 'domain': 'example.com'}],
+            request)
+        self.assertEqual([(c.name, c.value, c.domain, c.path) for c in cookies],
+            [('C1', 'value1', 'www.example.com', '/'),
+             ('C2', 'value2', '.example.com', '/foo')])
@@ -97,6 +97,21 @@ class HeadersTest(unittest.TestCase):
         assert h1.getlist('header1') is not h2.getlist('header1')
         assert isinstance(h2, Headers)
 
+    def test_copy_keeps_encoding(self):
+        h1 = Headers({'header1': 'value1'}, encoding='latin1')
+        h2 = h1.copy()
+        self.assertEqual(h2.encoding, 'latin1')
+        h2.appendlist('header1', 'value2')
+        self.assertEqual(h1.getlist('header1'), ['value1'])
+        self.assertEqual(h2.getlist('header1'), ['value1', 'value2'])
+
+    def test_normkey(self):
+        h = Headers()
+        self.assertEqual(h.normkey('content-type'), 'Content-Type')
+        assert h.normkey('content-TYPE') is h.normkey('CONTENT-TYPE')
+        self.assertEqual(h.normkey(u'x-custom'), 'X-Custom')
+        assert isinstance(h.normkey(u'x-custom'), str)
+
     def test_appendlist(self):
         h1 = Headers({'header1': 'value1'})
         h1.appendlist('header1', 'value3')
@@ -1,10 +1,15 @@
 import cgi
+import weakref
 import unittest
 import xmlrpclib
 from cStringIO import StringIO
 from urlparse import urlparse
 
+from w3lib.url import safe_url_string
+
 from scrapy.http import Request, FormRequest, XmlRpcRequest, Headers, HtmlResponse
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.url import escape_ajax
 
 
 class RequestTest(unittest.TestCase):
@@ -106,6 +111,17 @@ class RequestTest(unittest.TestCase):
         assert isinstance(r4.body, str)
         self.assertEqual(r4.body, "Price: \xa3100")
 
+    def test_safe_url(self):
+        urls = ["http://www.example.com/a?b=1&c=d%20e#f",
+                "http://www.example.com/a b/\xa3?c=<d>",
+                "http://www.example.com/%zz?|~=!$",
+                "http://www.example.com/#!a=b"]
+        for url in urls:
+            r = self.request_class(url)
+            self.assertEqual(r.url, escape_ajax(safe_url_string(url)))
+            self.assertEqual(r.replace().url, r.url)
+            self.assertEqual(self.request_class(r.url).url, r.url)
+
     def test_ajax_url(self):
         # ascii url
         r = self.request_class(url="http://www.example.com/ajax.html#!key=value")
@@ -175,6 +191,39 @@ class RequestTest(unittest.TestCase):
         r = self.request_class("http://www.example.com", method=u"POST")
         assert isinstance(r.method, str)
 
+    def test_slots(self):
+        r = self.request_class("http://www.example.com")
+        weakref.ref(r)
+        assert not hasattr(r, '__dict__'), "%s does not use __slots__" % \
+            r.__class__.__name__
+
+    def test_lazy_attributes(self):
+        r1 = Request("http://www.example.com", encoding='latin1')
+        self.assertEqual(r1.copy()._headers, None)
+        self.assertEqual(r1.copy()._cookies, None)
+        self.assertEqual(r1.copy()._meta, None)
+        assert isinstance(r1.headers, Headers)
+        self.assertEqual(r1.headers.encoding, 'latin1')
+        assert r1.headers is r1.headers
+        self.assertEqual(r1.cookies, {})
+        assert r1.cookies is r1.cookies
+
+        cookies = {'currency': 'usd'}
+        r1.cookies = cookies
+        assert r1.cookies is cookies
+        r1.headers = headers = Headers({'Accept': 'text/html'})
+        assert r1.headers is headers
+        r2 = r1.copy()
+        self.assertEqual(r2.cookies, cookies)
+        self.assertEqual(r2.headers, headers)
+        assert r2.headers is not headers
+
+    def test_derived_values_reset(self):
+        r = Request("http://www.example.com/a")
+        self.assertEqual(urlparse_cached(r).path, '/a')
+        r._set_url("http://www.example.com/b")
+        self.assertEqual(urlparse_cached(r).path, '/b')
+
 
 class FormRequestTest(RequestTest):
 
@@ -201,6 +201,24 @@ class TextResponseTest(BaseResponseTest):
                                 encoding='utf-16')
         self._assert_response_values(r, 'utf-16', u"hi")
 
+    def test_inferred_encoding(self):
+        # a multibyte character spanning two chunks of the validation
+        body = 'a' * 65535 + '\xc2\xa3' + 'b' * 10
+        r1 = self.response_class("http://www.example.com", body=body)
+        self.assertEqual(r1.encoding, 'utf-8')
+        # inferring the encoding doesn't decode the body
+        self.assertEqual(r1._cached_ubody, None)
+        self.assertEqual(r1.body_as_unicode(), u'a' * 65535 + u'\xa3' + u'b' * 10)
+
+        r2 = self.response_class("http://www.example.com", body='\xa3' + body)
+        self._assert_response_values(r2, 'cp1252', u'\xa3' + body.decode('cp1252'))
+        r3 = self.response_class("http://www.example.com", body='plain text')
+        self._assert_response_values(r3, 'cp1252', u'plain text')
+        # neither utf-8 nor cp1252
+        r4 = self.response_class("http://www.example.com", body='\x81\xff')
+        self.assertEqual(r4.encoding, 'ascii')
+        self.assertEqual(r4.body_as_unicode(), u'\ufffd\ufffd')
+
     def test_invalid_utf8_encoded_body_with_valid_utf8_BOM(self):
         r6 = self.response_class("http://www.example.com",
                                  headers={"Content-type": ["text/html; charset=utf-8"]},
@@ -13,8 +13,14 @@ class ResponseTypesTest(unittest.TestCase):
             ('file.xml', XmlResponse),
             ('file.html', HtmlResponse),
             ('file.unknownext', Response),
+            ('file.tgz', Response),
+            ('.html', Response),
+            ('http://www.example.com/dir.xml/page.html', HtmlResponse),
+            ('http://www.example.com/dir.html/page', Response),
+            ('data:text/xml,<x/>', XmlResponse),
         ]
-        for source, cls in mappings:
+        # twice, the second time the classes are already cached
+        for source, cls in mappings * 2:
             retcls = responsetypes.from_filename(source)
             assert retcls is cls, "%s ==> %s != %s" % (source, retcls, cls)
 
@@ -36,7 +42,7 @@ class ResponseTypesTest(unittest.TestCase):
             ('application/xml; charset=UTF-8', XmlResponse),
             ('application/octet-stream', Response),
         ]
-        for source, cls in mappings:
+        for source, cls in mappings * 2:
             retcls = responsetypes.from_content_type(source)
             assert retcls is cls, "%s ==> %s != %s" % (source, retcls, cls)
 
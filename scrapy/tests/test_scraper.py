@@ -0,0 +1,77 @@
+from time import sleep
+
+from twisted.trial import unittest
+from twisted.internet import defer, reactor
+
+from scrapy.core.scraper import Scraper
+from scrapy.http import Request, Response
+from scrapy.logformatter import LogFormatter
+from scrapy.spider import BaseSpider
+from scrapy.utils.test import get_crawler
+
+
+class ScraperTest(unittest.TestCase):
+
+    def setUp(self):
+        self.crawler = get_crawler({'SCRAPER_TIME_SLICE': 0.01})
+        self.crawler.logformatter = LogFormatter.from_crawler(self.crawler)
+        self.spider = BaseSpider('foo')
+        self.crawler.stats.open_spider(self.spider)
+        self.scraper = Scraper(self.crawler)
+
+    def tearDown(self):
+        self.crawler.stats.close_spider(self.spider, '')
+
+    def _output(self, name, count, log, delay=0):
+        for i in xrange(count):
+            if delay:
+                sleep(delay)
+            log.append(name)
+            yield None
+
+    def _handle(self, output, callback=None):
+        request = Request('http://example.com/', callback=callback)
+        response = Response(request.url)
+        return self.scraper.handle_spider_output(output, request, response,
+            self.spider)
+
+    @defer.inlineCallbacks
+    def test_output_interleaved(self):
+        log = []
+        dfd1 = self._handle(self._output('many', 1000, log))
+        dfd2 = self._handle(self._output('few', 3, log))
+        yield defer.DeferredList([dfd1, dfd2])
+        # the output of the second response doesn't wait for the first one
+        self.assertEqual(log.count('few'), 3)
+        last = len(log) - 1 - log[::-1].index('few')
+        assert last < log.count('many') / 2
+
+    @defer.inlineCallbacks
+    def test_time_slice(self):
+        log = []
+        ticks = []
+        def tick():
+            ticks.append(len(log))
+            if len(log) < 50:
+                reactor.callLater(0, tick)
+        reactor.callLater(0, tick)
+        yield self._handle(self._output('slow', 50, log, delay=0.002))
+        # the reactor runs between the time slices of the output
+        assert len([n for n in ticks if 0 < n < 50]) > 1
+
+    @defer.inlineCallbacks
+    def test_callback_time_stats(self):
+        def parse_page(response):
+            pass
+        yield self._handle(self._output('a', 3, []), callback=parse_page)
+        stats = self.crawler.stats.get_stats(self.spider)
+        assert 'scraper/callback_time/parse_page' in stats
+        assert 'scraper/callback_time_max/parse_page' in stats
+
+    @defer.inlineCallbacks
+    def test_callback_time_stats_without_callback(self):
+        request = Request('http://example.com/')
+        yield self.scraper.handle_spider_output(self._output('a', 3, []),
+            request, request, self.spider)
+        stats = self.crawler.stats.get_stats(self.spider)
+        assert not [k for k in stats if k.startswith('scraper/callback_time')]
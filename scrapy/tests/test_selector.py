@@ -43,6 +43,27 @@ class XPathSelectorTestCase(unittest.TestCase):
         self.assertEqual([x.extract() for x in xpath.select("concat(//input[@name='a']/@value, //input[@name='b']/@value)")],
                          [u'12'])
 
+    @libxml2debug
+    def test_select_extract(self):
+        body = "<p><input name='a' value='1'/><input name='b' value='2'/>text</p><p/>"
+        response = TextResponse(url="http://example.com", body=body)
+        x = self.hxs_cls(response)
+
+        for xpath in ('//input', '//input/@name', '//p/text()', 'count(//input)',
+                      "//input[@name='a']/@value = '1'", '//nothing'):
+            self.assertEqual(x.select_extract(xpath), x.select(xpath).extract())
+            self.assertEqual(x.select(xpath).select_extract('.'),
+                             x.select(xpath).select('.').extract())
+        self.assertEqual(x.select_extract('//input/@value'), [u'1', u'2'])
+
+        self.assertEqual(x.select_extract_first('//input/@name'), u'a')
+        self.assertEqual(x.select_extract_first('//nothing'), None)
+        self.assertEqual(x.select_extract_first('//nothing', u''), u'')
+        self.assertEqual(x.select('//p').select_extract_first('input/@name'), u'a')
+        self.assertEqual(x.select('//p').select_extract_first('text()'), u'text')
+        self.assertEqual(x.select('//p').select_extract_first('nothing', u''), u'')
+        self.assertRaises(ValueError, x.select_extract, '//p[')
+
     @libxml2debug
     def test_selector_unicode_query(self):
         body = u"<p><input name='\xa9' value='1'/></p>"
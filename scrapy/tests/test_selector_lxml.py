@@ -3,10 +3,12 @@ Selectors tests, specific for lxml backend
 """
 
 import unittest
+from lxml import etree
 from scrapy.tests import test_selector
 from scrapy.http import TextResponse, HtmlResponse, XmlResponse
 from scrapy.selector.lxmldocument import LxmlDocument
-from scrapy.selector.lxmlsel import XmlXPathSelector, HtmlXPathSelector, XPathSelector
+from scrapy.selector.lxmlsel import XmlXPathSelector, HtmlXPathSelector, XPathSelector, \
+    xpath_cache, xpath_cache_stats
 
 
 class LxmlXPathSelectorTestCase(test_selector.XPathSelectorTestCase):
@@ -27,6 +29,22 @@ class LxmlXPathSelectorTestCase(test_selector.XPathSelectorTestCase):
         xxs.remove_namespaces()
         self.assertEqual(len(xxs.select("//link")), 2)
 
+    def test_xpath_cache(self):
+        hxs = HtmlXPathSelector(text='<html><body><p>test</p></body></html>')
+        xpath = '//p/text() | //div[@id="xpath-cache-test"]'
+        hits, misses = xpath_cache_stats['hits'], xpath_cache_stats['misses']
+        self.assertEqual(hxs.select(xpath).extract(), [u'test'])
+        self.assertEqual(xpath_cache_stats['misses'], misses + 1)
+        self.assertEqual(hxs.select(xpath).extract(), [u'test'])
+        self.assertEqual(xpath_cache_stats['hits'], hits + 1)
+        self.assertEqual(xpath_cache_stats['misses'], misses + 1)
+        # expressions are cached per namespaces
+        hxs.register_namespace('x', 'http://example.com/x')
+        hxs.select(xpath)
+        self.assertEqual(xpath_cache_stats['misses'], misses + 2)
+        assert (xpath, (('x', 'http://example.com/x'),)) in xpath_cache
+        self.assertRaises(ValueError, hxs.select, '//p[')
+
 class Libxml2DocumentTest(unittest.TestCase):
 
     def test_caching(self):
@@ -50,3 +68,38 @@ class Libxml2DocumentTest(unittest.TestCase):
         response = TextResponse('http://example.com/catalog/product/blabla-123',
                             headers={'Content-Type': 'text/plain; charset=utf-8'}, body=self.body_content)
         LxmlDocument(response)
+
+    def test_raw_body(self):
+        # bodies are parsed as they are when libxml2 supports their encoding,
+        # without decoding them
+        for encoding, text in [('utf-8', u'caf\xe9 \u20ac'),
+                               ('cp1252', u'caf\xe9 \u20ac'),
+                               ('koi8-r', u'\u043a\u0430\u0444\u0435'),
+                               ('shift_jis', u'\u30ab\u30d5\u30a7')]:
+            body = u'<html><body><p>%s</p></body></html>' % text
+            response = HtmlResponse('http://www.example.com',
+                                    body=body.encode(encoding), encoding=encoding)
+            self.assertEqual(LxmlDocument(response).xpath('//p/text()'), [text])
+            self.assertEqual(response._cached_ubody, None)
+
+    def test_invalid_bytes(self):
+        # bodies with invalid bytes are decoded (replacing them) before parsing
+        for encoding, body in [('utf-8', '<p>a\xffb</p><p>c</p>'),
+                               ('cp1252', '<p>a\x81b</p><p>c</p>')]:
+            for cls, parser in [(HtmlResponse, etree.HTMLParser),
+                                (XmlResponse, etree.XMLParser)]:
+                response = cls('http://www.example.com', body='<r>%s</r>' % body,
+                               encoding=encoding)
+                doc = LxmlDocument(response, parser)
+                self.assertEqual(doc.xpath('//p/text()'), [u'a\ufffdb', u'c'])
+
+    def test_unsupported_encoding(self):
+        body = u'<html><body><p>caf\xe9</p></body></html>'.encode('mac-roman')
+        response = HtmlResponse('http://www.example.com', body=body, encoding='mac-roman')
+        self.assertEqual(LxmlDocument(response).xpath('//p/text()'), [u'caf\xe9'])
+
+    def test_leading_whitespace(self):
+        response = XmlResponse('http://www.example.com', encoding='utf-8',
+                               body='\n  <?xml version="1.0"?><a>x</a>')
+        doc = LxmlDocument(response, etree.XMLParser)
+        self.assertEqual(doc.xpath('/a/text()'), ['x'])
@@ -76,7 +76,7 @@ class XMLFeedSpiderTest(BaseSpiderTest):
                     'custom': selector.select('other/@b:custom').extract(),
                 }
 
-        for iterator in ('iternodes', 'xml'):
+        for iterator in ('iternodes', 'iterparse', 'xml'):
             spider = _XMLSpider('example', iterator=iterator)
             output = list(spider.parse(response))
             self.assertEqual(len(output), 2, iterator)
@@ -91,11 +91,59 @@ class XMLFeedSpiderTest(BaseSpiderTest):
                  'custom': []},
             ], iterator)
 
+    def test_iterparse_namespaced_itertag(self):
+        body = """<?xml version="1.0" encoding="UTF-8"?>
+        <feed xmlns="http://www.w3.org/2005/Atom">
+        <entry><title>Entry 1</title></entry>
+        <entry><title>Entry 2</title></entry>
+        </feed>"""
+        response = XmlResponse(url='http://example.com/feed.atom', body=body)
+
+        class _XMLSpider(self.spider_class):
+            iterator = 'iterparse'
+            itertag = 'atom:entry'
+            namespaces = (('atom', 'http://www.w3.org/2005/Atom'),)
+
+            def parse_node(self, response, selector):
+                yield {'title': selector.select('atom:title/text()').extract()}
+
+        output = list(_XMLSpider('example').parse(response))
+        self.assertEqual(output, [{'title': [u'Entry 1']}, {'title': [u'Entry 2']}])
+
 
 class CSVFeedSpiderTest(BaseSpiderTest):
 
     spider_class = CSVFeedSpider
 
+    def test_parse_batch(self):
+        body = 'id,name\n' + ''.join('%d,name %d\n' % (i, i) for i in range(5))
+        response = TextResponse(url='http://example.com/feed.csv', body=body)
+
+        class _CSVSpider(self.spider_class):
+            batch_size = 2
+            batches = []
+
+            def parse_batch(self, response, rows):
+                self.batches.append(len(rows))
+                return [{'id': row['id']} for row in rows]
+
+        output = list(_CSVSpider('example').parse(response))
+        self.assertEqual(output, [{'id': unicode(i)} for i in range(5)])
+        self.assertEqual(_CSVSpider.batches, [2, 2, 1])
+
+    def test_parse_batch_default(self):
+        body = 'id,name\n1,one\n2,two\n'
+        response = TextResponse(url='http://example.com/feed.csv', body=body)
+
+        class _CSVSpider(self.spider_class):
+            batch_size = 10
+
+            def parse_row(self, response, row):
+                yield {'name': row['name']}
+
+        output = list(_CSVSpider('example').parse(response))
+        self.assertEqual(output, [{'name': u'one'}, {'name': u'two'}])
+
 
 class CrawlSpiderTest(BaseSpiderTest):
 
@@ -134,5 +182,26 @@ class SitemapSpiderTest(BaseSpiderTest):
         r = Response(url="http://www.example.com/sitemap.xml.gz", body=self.GZBODY)
         self.assertEqual(spider._get_sitemap_body(r), self.BODY)
 
+    def test_parse_sitemap_gzipped(self):
+        urls = ''.join('<url><loc>http://www.example.com/%d</loc></url>' % i
+                       for i in range(100))
+        body = '<?xml version="1.0" encoding="UTF-8"?>\n' \
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' \
+            '%s</urlset>' % urls
+        f = StringIO()
+        g = gzip.GzipFile(fileobj=f, mode='w+b')
+        g.write(body)
+        g.close()
+        r = Response(url="http://www.example.com/sitemap.xml.gz", body=f.getvalue())
+
+        spider = self.spider_class("example.com")
+        requests = list(spider._parse_sitemap(r))
+        self.assertEqual([x.url for x in requests],
+                         ['http://www.example.com/%d' % i for i in range(100)])
+
+        spider.sitemap_max_size = len(body) / 2
+        requests = list(spider._parse_sitemap(r))
+        assert 0 < len(requests) < 100, len(requests)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,7 @@
 import copy
 import unittest
 
-from scrapy.utils.datatypes import CaselessDict
+from scrapy.utils.datatypes import CaselessDict, LocalCache, LRUCache
 
 __doctests__ = ['scrapy.utils.datatypes']
 
@@ -129,6 +129,38 @@ class CaselessDictTest(unittest.TestCase):
         assert isinstance(h2, CaselessDict)
 
 
+class LocalCacheTest(unittest.TestCase):
+
+    def test_cache_limit(self):
+        cache = LocalCache(limit=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache['c'] = 3
+        self.assertEqual(cache.keys(), ['b', 'c'])
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_least_recently_used_expires_first(self):
+        cache = LRUCache(limit=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(cache['a'], 1)
+        cache['c'] = 3
+        self.assertEqual(cache.keys(), ['a', 'c'])
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.get('b'), None)
+        cache['d'] = 4
+        self.assertEqual(cache.keys(), ['c', 'd'])
+
+    def test_update_existing_key(self):
+        cache = LRUCache(limit=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        cache['a'] = 3
+        self.assertEqual(cache.items(), [('b', 2), ('a', 3)])
+
+
 if __name__ == "__main__":
     unittest.main()
 
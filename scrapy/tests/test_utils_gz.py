@@ -2,7 +2,7 @@ import unittest
 from os.path import join
 
 from scrapy.tests import tests_datadir
-from scrapy.utils.gz import gunzip
+from scrapy.utils.gz import gunzip, GunzipReader
 
 SAMPLEDIR = join(tests_datadir, 'compressed')
 
@@ -26,3 +26,16 @@ class GzTest(unittest.TestCase):
         with open(join(SAMPLEDIR, 'truncated-crc-error-short.gz'), 'rb') as f:
             text = gunzip(f.read())
             assert text.endswith('</html>')
+
+    def test_gunzip_reader(self):
+        with open(join(SAMPLEDIR, 'feed-sample1.xml.gz'), 'rb') as f:
+            reader = GunzipReader(f.read())
+            chunks = list(iter(lambda: reader.read(1000), ''))
+            self.assertEqual(len(chunks), 10)
+            self.assertEqual(reader.size, 9950)
+
+    def test_gunzip_reader_truncated(self):
+        with open(join(SAMPLEDIR, 'truncated-crc-error.gz'), 'rb') as f:
+            reader = GunzipReader(f.read())
+            text = ''.join(iter(lambda: reader.read(1000), ''))
+            assert text.endswith('</html')
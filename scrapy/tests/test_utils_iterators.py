@@ -1,8 +1,7 @@
 import os
 from twisted.trial import unittest
 
-from scrapy.utils.iterators import csviter, xmliter
-from scrapy.contrib_exp.iterators import xmliter_lxml
+from scrapy.utils.iterators import csviter, xmliter, xmliter_lxml
 from scrapy.http import XmlResponse, TextResponse, Response
 from scrapy.tests import get_testdata
 
@@ -127,6 +126,15 @@ class LxmlXmliterTestCase(XmliterTestCase):
         node = namespace_iter.next()
         self.assertEqual(node.select('text()').extract(), ['http://www.mydummycompany.com/images/item2.jpg'])
 
+    def test_xmliter_nodes_outlive_iteration(self):
+        body = '<products>%s</products>' % ''.join(
+            '<product><id>%d</id></product>' % i for i in range(1000))
+        nodes = list(self.xmliter(body, 'product'))
+        self.assertEqual(len(nodes), 1000)
+        self.assertEqual(nodes[0].select('id/text()').extract(), [u'0'])
+        # each node is the root of its own document
+        self.assertEqual(nodes[10].select('//id/text()').extract(), [u'10'])
+
 
 class UtilsCsvTestCase(unittest.TestCase):
     sample_feeds_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'sample_data', 'feeds')
@@ -228,6 +236,38 @@ class UtilsCsvTestCase(unittest.TestCase):
             [{u'id': u'1', u'name': u'cp852', u'value': u'test'},
              {u'id': u'2', u'name': u'something', u'value': u'\u255a\u2569\u2569\u2569\u2550\u2550\u2557'}])
 
+    def test_csviter_detected_encoding(self):
+        # the encoding is detected from the start of the body, later rows
+        # which aren't utf-8 are decoded as cp1252
+        body = 'id,name\n1,%s\n2,caf\xe9\n' % ('x' * 70000)
+        response = TextResponse(url="http://example.com/", body=body)
+        rows = list(csviter(response))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1], {u'id': u'2', u'name': u'caf\xe9'})
+
+    def test_csviter_declared_encoding_invalid_bytes(self):
+        # only the invalid bytes are replaced with a declared encoding
+        body = 'id,name\n1,caf\xc3\xa9 \xff\n'
+        response = TextResponse(url="http://example.com/", body=body,
+            encoding='utf-8')
+        self.assertEqual(list(csviter(response)),
+            [{u'id': u'1', u'name': u'caf\xe9 \ufffd'}])
+
+    def test_csviter_file(self):
+        with open(self.sample_feed_path, 'rb') as f:
+            self.assertEqual([row for row in csviter(f)],
+                             [{u'id': u'1', u'name': u'alpha',   u'value': u'foobar'},
+                              {u'id': u'2', u'name': u'unicode', u'value': u'\xfan\xedc\xf3d\xe9\u203d'},
+                              {u'id': u'3', u'name': u'multi',   u'value': FOOBAR_NL},
+                              {u'id': u'4', u'name': u'empty',   u'value': u''}])
+
+    def test_csviter_batch_size(self):
+        body = get_testdata('feeds', 'feed-sample3.csv')
+        response = TextResponse(url="http://example.com/", body=body)
+        batches = list(csviter(response, batch_size=3))
+        self.assertEqual([len(rows) for rows in batches], [3, 1])
+        self.assertEqual(batches[1], [{u'id': u'4', u'name': u'empty', u'value': u''}])
+
 
 if __name__ == "__main__":
     unittest.main()
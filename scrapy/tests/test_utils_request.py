@@ -1,7 +1,7 @@
 import unittest
 from scrapy.http import Request
-from scrapy.utils.request import request_fingerprint, _fingerprint_cache, \
-    request_authenticate, request_httprepr
+from scrapy.utils.request import request_fingerprint, \
+    request_authenticate, request_httprepr, fingerprint_cache, fingerprint_cache_stats
 
 class UtilsRequestTest(unittest.TestCase):
 
@@ -16,7 +16,7 @@ class UtilsRequestTest(unittest.TestCase):
         self.assertNotEqual(request_fingerprint(r1), request_fingerprint(r2))
 
         # make sure caching is working
-        self.assertEqual(request_fingerprint(r1), _fingerprint_cache[r1][None])
+        self.assertEqual(request_fingerprint(r1), r1._fingerprints[None])
 
         r1 = Request("http://www.example.com/members/offers.html")
         r2 = Request("http://www.example.com/members/offers.html")
@@ -55,6 +55,24 @@ class UtilsRequestTest(unittest.TestCase):
         fp2 = request_fingerprint(r2)
         self.assertNotEqual(fp1, fp2)
 
+    def test_request_fingerprint_shared_cache(self):
+        fingerprint_cache.clear()
+        hits, misses = fingerprint_cache_stats['hits'], fingerprint_cache_stats['misses']
+        r1 = Request("http://www.example.com/shared?b=2&a=1")
+        fp = request_fingerprint(r1)
+        self.assertEqual(fingerprint_cache[('GET', r1.url)], fp)
+        self.assertEqual(request_fingerprint(r1.copy()), fp)
+        self.assertEqual(fingerprint_cache_stats['misses'], misses + 1)
+        self.assertEqual(fingerprint_cache_stats['hits'], hits + 1)
+
+        # requests with body or included headers aren't cached
+        r2 = Request("http://www.example.com/shared?b=2&a=1", method='POST', body='body')
+        self.assertNotEqual(request_fingerprint(r2), fp)
+        r3 = r1.copy()
+        r3.headers['Accept-Language'] = 'en'
+        self.assertNotEqual(request_fingerprint(r3, include_headers=['Accept-Language']), fp)
+        self.assertEqual(len(fingerprint_cache), 1)
+
     def test_request_authenticate(self):
         r = Request("http://www.example.com")
         request_authenticate(r, 'someuser', 'somepass')
@@ -1,4 +1,5 @@
 import unittest
+from cStringIO import StringIO
 
 from scrapy.utils.sitemap import Sitemap, sitemap_urls_from_robots
 
@@ -159,6 +160,45 @@ Disallow: /forum/active/
             {'lastmod': '2013-07-15', 'loc': 'http://www.example.com/sitemap3.xml'},
         ])
 
+    def _urlset(self, count):
+        urls = ''.join('<url><loc>http://www.example.com/%d</loc></url>' % i
+                       for i in xrange(count))
+        return '<?xml version="1.0" encoding="UTF-8"?>\n' \
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' \
+            '%s</urlset>' % urls
+
+    def test_sitemap_file(self):
+        s = Sitemap(StringIO(self._urlset(1000)))
+        self.assertEqual(s.type, 'urlset')
+        locs = [d['loc'] for d in s]
+        self.assertEqual(len(locs), 1000)
+        self.assertEqual(locs[-1], 'http://www.example.com/999')
+        self.assertFalse(s.truncated)
+
+    def test_sitemap_max_size(self):
+        body = self._urlset(1000)
+        s = Sitemap(body, max_size=len(body) / 2)
+        locs = [d['loc'] for d in s]
+        assert 0 < len(locs) < 1000, len(locs)
+        self.assertEqual(locs, ['http://www.example.com/%d' % i
+                                for i in xrange(len(locs))])
+        self.assertTrue(s.truncated)
+
+        s = Sitemap(body, max_size=len(body))
+        self.assertEqual(len(list(s)), 1000)
+        self.assertFalse(s.truncated)
+
+    def test_sitemap_unicode(self):
+        s = Sitemap(u'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                    u'<url><loc>http://www.example.com/caf\xe9</loc></url></urlset>')
+        self.assertEqual(s.type, 'urlset')
+        self.assertEqual(list(s), [{'loc': u'http://www.example.com/caf\xe9'}])
+
+    def test_sitemap_invalid(self):
+        s = Sitemap("")
+        self.assertEqual(s.type, None)
+        self.assertEqual(list(s), [])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 
 from scrapy.spider import BaseSpider
-from scrapy.utils.url import url_is_from_any_domain, url_is_from_spider, canonicalize_url
+from scrapy.utils.url import url_is_from_any_domain, url_is_from_spider, canonicalize_url, \
+    DomainIndex, canonicalize_url_cache, canonicalize_url_cache_stats
 
 __doctests__ = ['scrapy.utils.url']
 
@@ -25,6 +26,22 @@ class UrlUtilsTest(unittest.TestCase):
         self.assertFalse(url_is_from_any_domain(url, ['testdomain.com']))
         self.assertFalse(url_is_from_any_domain(url+'.testdomain.com', ['testdomain.com']))
 
+    def test_domain_index(self):
+        index = DomainIndex(['example.com', 'co.uk', 'a.b.example.org'])
+        for host in ('example.com', 'www.example.com', 'a.b.example.com',
+                     'example.co.uk', 'a.b.example.org', 'c.a.b.example.org'):
+            self.assertTrue(index.matches(host), host)
+        for host in ('', 'com', 'notexample.com', 'example.com.br', 'uk',
+                     'b.example.org', 'ab.example.org', 'example.org'):
+            self.assertFalse(index.matches(host), host)
+
+        index.add('example.org')
+        self.assertTrue(index.matches('b.example.org'))
+
+        url = 'http://www.wheele-bin-art.co.uk/get/product/123'
+        self.assertTrue(url_is_from_any_domain(url, DomainIndex(['wheele-bin-art.co.uk'])))
+        self.assertFalse(url_is_from_any_domain(url, DomainIndex(['art.co.uk'])))
+
     def test_url_is_from_spider(self):
         spider = BaseSpider(name='example.com')
         self.assertTrue(url_is_from_spider('http://www.example.com/some/page.html', spider))
@@ -66,6 +83,28 @@ class UrlUtilsTest(unittest.TestCase):
         self.assertTrue(url_is_from_spider('http://www.example.net/some/page.html', MySpider))
         self.assertFalse(url_is_from_spider('http://www.example.us/some/page.html', MySpider))
 
+    def test_canonicalize_url_cache(self):
+        canonicalize_url_cache.clear()
+        hits, misses = canonicalize_url_cache_stats['hits'], canonicalize_url_cache_stats['misses']
+        url = "http://www.Example.com/do?b=2&a=1"
+        canonical = "http://www.example.com/do?a=1&b=2"
+        self.assertEqual(canonicalize_url(url), canonical)
+        self.assertEqual(canonicalize_url(url), canonical)
+        # the canonical form is cached as its own canonical form too
+        self.assertEqual(canonicalize_url(canonical), canonical)
+        self.assertEqual(canonicalize_url_cache_stats['misses'], misses + 1)
+        self.assertEqual(canonicalize_url_cache_stats['hits'], hits + 2)
+
+        self.assertEqual(canonicalize_url(url + '#frag', keep_fragments=True),
+                         canonical + '#frag')
+        self.assertEqual(canonicalize_url_cache_stats['misses'], misses + 2)
+
+        # unquoting the path of the canonical form again changes it
+        self.assertEqual(canonicalize_url("http://www.example.com/a%2541"),
+                         "http://www.example.com/a%41")
+        self.assertEqual(canonicalize_url("http://www.example.com/a%41"),
+                         "http://www.example.com/aA")
+
     def test_canonicalize_url(self):
         # simplest case
         self.assertEqual(canonicalize_url("http://www.example.com/"),
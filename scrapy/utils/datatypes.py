@@ -283,3 +283,44 @@ class LocalCache(OrderedDict):
         while len(self) >= self.limit:
             self.popitem(last=False)
         super(LocalCache, self).__setitem__(key, value)
+
+
+class LRUCache(LocalCache):
+    """Dictionary with a finite number of keys.
+
+    Least recently used items expires first.
+
+    """
+
+    def __getitem__(self, key):
+        value = OrderedDict.__getitem__(self, key)
+        OrderedDict.__delitem__(self, key)
+        OrderedDict.__setitem__(self, key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self:
+            OrderedDict.__delitem__(self, key)
+        super(LRUCache, self).__setitem__(key, value)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    # iterating over the values must not change the order of the keys
+
+    def itervalues(self):
+        for key in self:
+            yield OrderedDict.__getitem__(self, key)
+
+    def iteritems(self):
+        for key in self:
+            yield key, OrderedDict.__getitem__(self, key)
+
+    def values(self):
+        return list(self.itervalues())
+
+    def items(self):
+        return list(self.iteritems())
@@ -2,29 +2,43 @@ import struct
 from cStringIO import StringIO
 from gzip import GzipFile
 
-def gunzip(data):
-    """Gunzip the given data and return as much data as possible.
+class GunzipReader(object):
+    """File-like object which decompresses the given gzipped data as it's
+    read, so it never has to be decompressed as a whole.
 
-    This is resilient to CRC checksum errors.
+    Like gunzip(), this is resilient to CRC checksum errors.
     """
-    f = GzipFile(fileobj=StringIO(data))
-    output = ''
-    chunk = '.'
-    while chunk:
+
+    def __init__(self, data):
+        self._file = GzipFile(fileobj=StringIO(data))
+        self._done = False
+        self.size = 0
+
+    def read(self, n=-1):
+        if self._done:
+            return ''
         try:
-            chunk = f.read(8196)
-            output += chunk
+            chunk = self._file.read(n)
         except (IOError, EOFError, struct.error):
             # complete only if there is some data, otherwise re-raise
             # see issue 87 about catching struct.error
             # some pages are quite small so output is '' and f.extrabuf
             # contains the whole page content
-            if output or f.extrabuf:
-                output += f.extrabuf
-                break
+            if self.size or self._file.extrabuf:
+                chunk = self._file.extrabuf
+                self._done = True
             else:
                 raise
-    return output
+        self.size += len(chunk)
+        return chunk
+
+def gunzip(data):
+    """Gunzip the given data and return as much data as possible.
+
+    This is resilient to CRC checksum errors.
+    """
+    f = GunzipReader(data)
+    return ''.join(iter(lambda: f.read(8196), ''))
 
 def is_gzipped(response):
     """Return True if the response is gzipped, or False otherwise"""
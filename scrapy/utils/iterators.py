@@ -1,7 +1,10 @@
-import re, csv
+import re, csv, copy, codecs
 from cStringIO import StringIO
+from itertools import islice
 
-from scrapy.http import TextResponse
+from lxml import etree
+
+from scrapy.http import Response, TextResponse
 from scrapy.selector import XmlXPathSelector
 from scrapy import log
 from scrapy.utils.python import re_rsearch, str_to_unicode
@@ -32,38 +35,149 @@ def xmliter(obj, nodename):
         yield XmlXPathSelector(text=nodetext).select('//' + nodename)[0]
 
 
-def csviter(obj, delimiter=None, headers=None, encoding=None):
+def xmliter_lxml(obj, nodename, namespace=None, prefix='x'):
+    """Return a iterator of XPathSelector's over all nodes of a XML document,
+       given the name of the node to iterate, like xmliter(). The document is
+       parsed incrementally with lxml iterparse and the nodes are dropped once
+       iterated, so memory usage doesn't grow with the document size.
+
+    obj can be:
+    - a Response object
+    - a unicode string
+    - a string encoded as utf-8
+
+    namespace is the namespace uri of the nodes to iterate, which is
+    registered with the given prefix in the returned selectors.
+    """
+    reader = _StreamReader(obj)
+    tag = '{%s}%s' % (namespace, nodename) if namespace else nodename
+    namespaces = {prefix: namespace} if namespace else None
+    selxpath = '//' + ('%s:%s' % (prefix, nodename) if namespace else nodename)
+    iterable = etree.iterparse(reader, tag=tag, encoding=reader.encoding,
+                               recover=True, huge_tree=True)
+    for _, node in iterable:
+        # a copy of the node is the root of its own document, like the nodes
+        # returned by xmliter(), without serializing and parsing it again
+        yield XmlXPathSelector(_root=copy.deepcopy(node), _expr=selxpath,
+                               namespaces=namespaces)
+        node.clear()
+        while node.getprevious() is not None:
+            del node.getparent()[0]
+
+
+class _StreamReader(object):
+
+    def __init__(self, obj):
+        self._ptr = 0
+        if isinstance(obj, Response):
+            # inferring the encoding would decode the whole body, leave it
+            # to lxml unless it's declared
+            self._text = obj.body
+            self.encoding = obj._declared_encoding() \
+                if isinstance(obj, TextResponse) else None
+        else:
+            self._text, self.encoding = obj, 'utf-8'
+        self._is_unicode = isinstance(self._text, unicode)
+
+    def read(self, n=65535):
+        self.read = self._read_unicode if self._is_unicode else self._read_string
+        return self.read(n).lstrip()
+
+    def _read_string(self, n=65535):
+        s, e = self._ptr, self._ptr + n
+        self._ptr = e
+        return self._text[s:e]
+
+    def _read_unicode(self, n=65535):
+        s, e = self._ptr, self._ptr + n
+        self._ptr = e
+        return self._text[s:e].encode('utf-8')
+
+
+def csviter(obj, delimiter=None, headers=None, encoding=None, batch_size=None):
     """ Returns an iterator of dictionaries from the given csv object
 
     obj can be:
     - a Response object
     - a unicode string
     - a string encoded as utf-8
+    - a file object (ie. a body spooled to disk), which is read incrementally
 
     delimiter is the character used to separate field on the given obj.
 
     headers is an iterable that when provided offers the keys
     for the returned dictionaries, if not the first row is used.
+
+    If batch_size is given, lists of up to batch_size dictionaries are
+    returned instead of single dictionaries.
     """
-    encoding = obj.encoding if isinstance(obj, TextResponse) else encoding or 'utf-8'
-    def _getrow(csv_r):
-        return [str_to_unicode(field, encoding) for field in csv_r.next()]
+    # encoding used for the rows which can't be decoded with an encoding
+    # detected from the start of the body only
+    fallback = None
+    if isinstance(obj, TextResponse):
+        encoding = obj._declared_encoding()
+        if not encoding:
+            encoding = _csv_encoding(obj)
+            fallback = 'cp1252'
+    else:
+        encoding = encoding or 'utf-8'
 
-    lines = StringIO(body_or_str(obj, unicode=False))
+    if hasattr(obj, 'read'):
+        lines = obj
+    else:
+        # cStringIO doesn't copy the body, and lines are decoded one row at a
+        # time, instead of the whole body
+        lines = StringIO(body_or_str(obj, unicode=False))
     if delimiter:
         csv_r = csv.reader(lines, delimiter=delimiter)
     else:
         csv_r = csv.reader(lines)
 
     if not headers:
-        headers = _getrow(csv_r)
+        try:
+            headers = csv_r.next()
+        except StopIteration:
+            return
+    headers = _decode_row(headers, encoding, fallback)
 
+    rows = _csvrows(csv_r, headers, encoding, fallback)
+    if not batch_size:
+        for row in rows:
+            yield row
+        return
     while True:
-        row = _getrow(csv_r)
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        yield batch
+
+
+def _csvrows(csv_r, headers, encoding, fallback):
+    for row in csv_r:
         if len(row) != len(headers):
             log.msg(format="ignoring row %(csvlnum)d (length: %(csvrow)d, should be: %(csvheader)d)",
                     level=log.WARNING, csvlnum=csv_r.line_num, csvrow=len(row), csvheader=len(headers))
             continue
-        else:
-            yield dict(zip(headers, row))
+        yield dict(zip(headers, _decode_row(row, encoding, fallback)))
+
+
+def _decode_row(row, encoding, fallback=None):
+    """Decode the fields of the given csv row. Rows which can't be decoded
+    with the given encoding are decoded with the fallback encoding if given,
+    otherwise the invalid bytes are replaced."""
+    if fallback is None:
+        return [str_to_unicode(field, encoding, 'replace') for field in row]
+    try:
+        return [str_to_unicode(field, encoding) for field in row]
+    except UnicodeDecodeError:
+        return [str_to_unicode(field, fallback, 'replace') for field in row]
+
 
+def _csv_encoding(response, size=65536):
+    """Return the encoding of the given csv response detected from the start
+    of its body, instead of the whole body"""
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(response.body[:size])
+    except UnicodeDecodeError:
+        return 'cp1252'
+    return 'utf-8'
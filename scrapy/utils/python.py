@@ -138,13 +138,14 @@ def memoizemethod_noargs(method):
     return new_method
 
 _BINARYCHARS = set(map(chr, range(32))) - set(["\0", "\t", "\n", "\r"])
+_BINARYCHARS_STR = ''.join(sorted(_BINARYCHARS))
 
 def isbinarytext(text):
     """Return True if the given text is considered binary, or false
     otherwise, by looking for binary bytes at their chars
     """
     assert isinstance(text, str), "text must be str, got '%s'" % type(text).__name__
-    return any(c in _BINARYCHARS for c in text)
+    return len(text.translate(None, _BINARYCHARS_STR)) != len(text)
 
 def get_func_args(func, stripself=False):
     """Return the argument name list of a callable"""
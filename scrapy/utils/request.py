@@ -4,7 +4,6 @@ scrapy.http.Request objects
 """
 
 import hashlib
-import weakref
 from urlparse import urlunparse
 
 from twisted.internet.defer import Deferred
@@ -12,9 +11,14 @@ from w3lib.http import basic_auth_header
 
 from scrapy.utils.url import canonicalize_url
 from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.datatypes import LRUCache
 
 
-_fingerprint_cache = weakref.WeakKeyDictionary()
+# fingerprints of the last requests without body, by method and url, shared by
+# all the spiders of the process
+fingerprint_cache = LRUCache(10000)
+fingerprint_cache_stats = {'hits': 0, 'misses': 0}
+
 def request_fingerprint(request, include_headers=None):
     """
     Return the request fingerprint.
@@ -44,21 +48,37 @@ def request_fingerprint(request, include_headers=None):
     """
     if include_headers:
         include_headers = tuple([h.lower() for h in sorted(include_headers)])
-    cache = _fingerprint_cache.setdefault(request, {})
+    cache = request._fingerprints
+    if cache is None:
+        cache = request._fingerprints = {}
     if include_headers not in cache:
-        fp = hashlib.sha1()
-        fp.update(request.method)
-        fp.update(canonicalize_url(request.url))
-        fp.update(request.body or '')
-        if include_headers:
-            for hdr in include_headers:
-                if hdr in request.headers:
-                    fp.update(hdr)
-                    for v in request.headers.getlist(hdr):
-                        fp.update(v)
-        cache[include_headers] = fp.hexdigest()
+        if not include_headers and not request.body:
+            key = (request.method, request.url)
+            try:
+                cache[include_headers] = fingerprint_cache[key]
+            except KeyError:
+                fingerprint_cache_stats['misses'] += 1
+                fingerprint_cache[key] = cache[include_headers] = \
+                    _fingerprint(request, include_headers)
+            else:
+                fingerprint_cache_stats['hits'] += 1
+        else:
+            cache[include_headers] = _fingerprint(request, include_headers)
     return cache[include_headers]
 
+def _fingerprint(request, include_headers):
+    fp = hashlib.sha1()
+    fp.update(request.method)
+    fp.update(canonicalize_url(request.url))
+    fp.update(request.body or '')
+    if include_headers:
+        for hdr in include_headers:
+            if hdr in request.headers:
+                fp.update(hdr)
+                for v in request.headers.getlist(hdr):
+                    fp.update(v)
+    return fp.hexdigest()
+
 def request_authenticate(request, username, password):
     """Autenticate the given request (in place) using the HTTP basic access
     authentication mechanism (RFC 2617) and the given username and password
@@ -4,30 +4,95 @@ Module for processing Sitemaps.
 Note: The main purpose of this module is to provide support for the
 SitemapSpider, its API is subject to change without notice.
 """
+from cStringIO import StringIO
+
 import lxml.etree
 
 
 class Sitemap(object):
     """Class to parse Sitemap (type=urlset) and Sitemap Index
-    (type=sitemapindex) files"""
+    (type=sitemapindex) files
+
+    The sitemap can be given as a (byte or unicode) string or as a file-like
+    object, which is read and parsed incrementally while iterating, so the
+    entries can only be iterated once. If max_size is given, no more than
+    max_size bytes are read and the truncated attribute tells whether the
+    sitemap was larger.
+    """
+
+    def __init__(self, xmltext, max_size=None):
+        self._reader = _SitemapReader(xmltext, max_size)
+        self._events = lxml.etree.iterparse(self._reader, events=('start', 'end'),
+                                            recover=True, huge_tree=True)
+        try:
+            _, self._root = next(self._events)
+        except (StopIteration, lxml.etree.XMLSyntaxError):
+            self._root = None
+            self.type = None
+        else:
+            rt = self._root.tag
+            self.type = rt.split('}', 1)[1] if '}' in rt else rt
 
-    def __init__(self, xmltext):
-        xmlp = lxml.etree.XMLParser(recover=True)
-        self._root = lxml.etree.fromstring(xmltext, parser=xmlp)
-        rt = self._root.tag
-        self.type = self._root.tag.split('}', 1)[1] if '}' in rt else rt
+    @property
+    def truncated(self):
+        return self._reader.truncated
 
     def __iter__(self):
-        for elem in self._root.getchildren():
+        if self._root is None:
+            return
+        depth = count = 0
+        for event, elem in self._events:
+            if self._reader.truncated:
+                # elements closed by the parser at the end of truncated input
+                break
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth:
+                continue
             d = {}
-            for el in elem.getchildren():
+            for el in elem:
                 tag = el.tag
+                if not isinstance(tag, basestring): # comments
+                    continue
                 name = tag.split('}', 1)[1] if '}' in tag else tag
                 d[name] = el.text.strip() if el.text else ''
+            # free the entries already seen, a bunch at a time
+            count += 1
+            if count % 1000 == 0:
+                del self._root[:-1]
             if 'loc' in d:
                 yield d
 
 
+class _SitemapReader(object):
+
+    def __init__(self, xmltext, max_size=None):
+        if hasattr(xmltext, 'read'):
+            self._file = xmltext
+        else:
+            if isinstance(xmltext, unicode):
+                xmltext = xmltext.encode('utf-8')
+            self._file = StringIO(xmltext)
+        self._max_size = max_size
+        self.size = 0
+        self.truncated = False
+
+    def read(self, n=65535):
+        if self._max_size:
+            n = min(n, self._max_size - self.size)
+            if n <= 0:
+                self.truncated = self.truncated or bool(self._file.read(1))
+                return ''
+        data = self._file.read(n)
+        if not self.size:
+            # lxml refuses xml declarations not at the very beginning
+            data = data.lstrip()
+        self.size += len(data)
+        return data
+
+
 def sitemap_urls_from_robots(robots_text):
     """Return an iterator over all sitemap urls contained in the given
     robots.txt file
@@ -11,14 +11,41 @@ import cgi
 
 from w3lib.url import *
 from scrapy.utils.python import unicode_to_str
+from scrapy.utils.datatypes import LRUCache
+
+
+class DomainIndex(set):
+    """Set of domains which finds whether a host belongs to any of them (is
+    one of them or a subdomain of one of them) with a set lookup per label of
+    the host, instead of comparing it with each domain.
+
+    It can be used in place of host regexes (see OffsiteMiddleware) through
+    its search() method.
+    """
+
+    def matches(self, host):
+        """Return True if the host belongs to any of the domains"""
+        if host in self:
+            return True
+        i = host.find('.')
+        while i != -1:
+            if host[i+1:] in self:
+                return True
+            i = host.find('.', i + 1)
+        return False
+
+    search = matches
 
 
 def url_is_from_any_domain(url, domains):
-    """Return True if the url belongs to any of the given domains"""
+    """Return True if the url belongs to any of the given domains, which
+    are best given as a DomainIndex when checking many urls"""
     host = parse_url(url).netloc
 
     if host:
-        return any(((host == d) or (host.endswith('.%s' % d)) for d in domains))
+        if not isinstance(domains, DomainIndex):
+            domains = DomainIndex(domains)
+        return domains.matches(host)
     else:
         return False
 
@@ -33,6 +60,10 @@ def url_has_any_extension(url, extensions):
     return posixpath.splitext(parse_url(url).path)[1].lower() in extensions
 
 
+# canonical forms of the urls seen, shared by all the spiders of the process
+canonicalize_url_cache = LRUCache(10000)
+canonicalize_url_cache_stats = {'hits': 0, 'misses': 0}
+
 def canonicalize_url(url, keep_blank_values=True, keep_fragments=False,
         encoding=None):
     """Canonicalize the given url by applying the following procedures:
@@ -49,7 +80,18 @@ def canonicalize_url(url, keep_blank_values=True, keep_fragments=False,
     str.
 
     For examples see the tests in scrapy.tests.test_utils_url
+
+    The canonical forms of the last 10000 urls are kept in a cache
+    (canonicalize_url_cache).
     """
+    key = (url, keep_blank_values, keep_fragments)
+    try:
+        canonical = canonicalize_url_cache[key]
+    except KeyError:
+        canonicalize_url_cache_stats['misses'] += 1
+    else:
+        canonicalize_url_cache_stats['hits'] += 1
+        return canonical
 
     scheme, netloc, path, params, query, fragment = parse_url(url)
     keyvals = cgi.parse_qsl(query, keep_blank_values)
@@ -57,7 +99,14 @@ def canonicalize_url(url, keep_blank_values=True, keep_fragments=False,
     query = urllib.urlencode(keyvals)
     path = safe_url_string(_unquotepath(path)) or '/'
     fragment = '' if not keep_fragments else fragment
-    return urlparse.urlunparse((scheme, netloc.lower(), path, params, query, fragment))
+    canonical = urlparse.urlunparse((scheme, netloc.lower(), path, params, query, fragment))
+    canonicalize_url_cache[key] = canonical
+    # canonical urls are usually canonicalized again (ie. when fingerprinting
+    # the requests for extracted links), and they're their own canonical form
+    # unless unquoting their path again decodes something
+    if '%' not in path:
+        canonicalize_url_cache[(canonical, keep_blank_values, keep_fragments)] = canonical
+    return canonical
 
 
 def _unquotepath(path):